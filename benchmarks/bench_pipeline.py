@@ -0,0 +1,437 @@
+"""Offline benchmarks for the SEW fetch and import pipeline.
+
+Runs the integration's Collector, aura client and importer against a local fake
+browserless /function endpoint, a fake aura portal and a stub recorder, so no SEW
+account, browserless or Home Assistant instance is needed. Each scenario prints
+one JSON object per line, e.g.
+
+    python benchmarks/bench_pipeline.py --days 365 --latency 0.05 --output bench_output.txt
+
+Measured per scenario:
+    days_per_second: days fetched and imported per second of wall time
+    http_requests: requests answered by the fake servers
+    recorder_calls_per_day: recorder imports, adjustments and queries per day
+    peak_memory_kib: peak memory allocated while the scenario ran
+    loop_block_ms_max / loop_block_ms_total: how long the event loop was held up
+
+The fake servers run in the same process and event loop, so their work is included
+in the memory and loop figures. Compare results from the same machine and options.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from datetime import datetime as dt
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs
+from zoneinfo import ZoneInfo
+
+from aiohttp import ClientSession, web
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from homeassistant.util import dt as dt_util  # noqa: E402
+
+from custom_components.sew_usage import importer  # noqa: E402
+from custom_components.sew_usage.aura import AuraClient  # noqa: E402
+from custom_components.sew_usage.collector import Collector, parse_usage  # noqa: E402
+from custom_components.sew_usage.session import SEWSession  # noqa: E402
+
+TIME_ZONE = "Australia/Melbourne"
+MAINS_SERIAL = "bench-mains"
+RECYCLED_SERIAL = "bench-recycled"
+STAT_ID = "sensor.water_usage_mains"
+MONITOR_INTERVAL = 0.005
+
+
+def make_day(
+    day_date: date, rng: random.Random, missing: float = 0.0
+) -> dict[str, Any]:
+    """Return a day of usage shaped like the SEW response.
+
+    Arguments:
+        day_date (date): The date of the readings
+        rng (random.Random): The random source
+        missing (float, optional): The share of hours without a reading. Defaults to 0.0.
+
+    Returns:
+        dict[str, Any]: The day of usage
+
+    """
+    return {
+        "apiDate": f"{day_date.isoformat()}T00:00:00+00:00",
+        "readings": [
+            None if rng.random() < missing else round(rng.uniform(0, 40), 1)
+            for _ in range(24)
+        ],
+    }
+
+
+def make_days(date_from: date, date_to: date, seed: int) -> list[dict[str, Any]]:
+    """Return every day of usage in a range.
+
+    Arguments:
+        date_from (date): The first date
+        date_to (date): The last date
+        seed (int): The random seed, so runs are repeatable
+
+    Returns:
+        list[dict[str, Any]]: The days of usage
+
+    """
+    rng = random.Random(seed)
+    return [
+        make_day(date_from + timedelta(days=offset), rng)
+        for offset in range((date_to - date_from).days + 1)
+    ]
+
+
+class FakeServers:
+    """A fake browserless endpoint and SEW aura portal on one local port."""
+
+    def __init__(self, latency: float, cap: int) -> None:
+        """Initialise the servers.
+
+        Arguments:
+            latency (float): Seconds each request takes to answer
+            cap (int): The most days the aura portal returns per action
+
+        """
+        self.latency = latency
+        self.cap = cap
+        self.requests = 0
+        self.url = ""
+        self._runner: web.AppRunner | None = None
+
+    async def async_start(self) -> None:
+        """Start listening on a free local port."""
+        app = web.Application(client_max_size=16 * 1024 * 1024)
+        app.router.add_get("/active", self._active)
+        app.router.add_post("/function", self._function)
+        app.router.add_post("/s/sfsites/aura", self._aura)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+
+    async def async_stop(self) -> None:
+        """Stop the servers."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _active(self, request: web.Request) -> web.Response:
+        return web.Response(status=204)
+
+    async def _function(self, request: web.Request) -> web.Response:
+        """Answer a scraper run in range mode, as the bundled script does."""
+        self.requests += 1
+        context = (await request.json())["context"]
+        await asyncio.sleep(self.latency)
+        date_from = date.fromisoformat(context["date_from"])
+        date_to = date.fromisoformat(context["date_to"])
+        body: dict[str, Any] = {
+            "mains": make_days(date_from, date_to, 1),
+            "timings": {"login": 0, "aura": []},
+        }
+        if context.get("recycled_water_serial"):
+            body["recycled"] = make_days(date_from, date_to, 2)
+        return web.json_response(body)
+
+    async def _aura(self, request: web.Request) -> web.Response:
+        """Answer a batch of getUsageData actions, capping each at self.cap days."""
+        self.requests += 1
+        form = parse_qs(await request.text())
+        message = json.loads(form["message"][0])
+        await asyncio.sleep(self.latency)
+        actions = []
+        for action in message["actions"]:
+            params = action["params"]["params"]
+            date_from = date.fromisoformat(params["dateFrom"])
+            date_to = min(
+                date.fromisoformat(params["dateTo"]),
+                date_from + timedelta(days=self.cap - 1),
+            )
+            seed = 1 if params["meterId"] == MAINS_SERIAL else 2
+            actions.append(
+                {
+                    "id": action["id"],
+                    "state": "SUCCESS",
+                    "returnValue": {"returnValue": make_days(date_from, date_to, seed)},
+                }
+            )
+        return web.Response(text="while(1);" + json.dumps({"actions": actions}))
+
+
+class StubRecorder:
+    """Stands in for the recorder, keeping imported sums in memory and counting calls."""
+
+    def __init__(self) -> None:
+        """Initialise the stub."""
+        self.sums: dict[dt, float] = {}
+        self.imports = 0
+        self.rows = 0
+        self.adjusts = 0
+        self.queries = 0
+
+    @property
+    def calls(self) -> int:
+        """Return the number of recorder calls made."""
+        return self.imports + self.adjusts + self.queries
+
+    async def async_block_till_done(self) -> None:
+        """Return at once, as imports are applied immediately."""
+
+    async def async_add_executor_job(self, target, *args):
+        """Run a query off the event loop, as the recorder does."""
+        return await asyncio.get_running_loop().run_in_executor(None, target, *args)
+
+    def async_adjust_statistics(
+        self, stat_id, start_time, sum_adjustment, unit
+    ) -> None:
+        """Shift every later sum."""
+        self.adjusts += 1
+        for start in self.sums:
+            if start >= start_time:
+                self.sums[start] += sum_adjustment
+
+    def import_statistics(self, hass, metadata, stats) -> None:
+        """Store imported rows."""
+        self.imports += 1
+        self.rows += len(stats)
+        for row in stats:
+            self.sums[row["start"]] = row["sum"]
+
+    def statistics_during_period(self, hass, start, end, ids, period, units, types):
+        """Return the stored sums in a period."""
+        self.queries += 1
+        rows = [
+            {"start": start_time.timestamp(), "sum": value}
+            for start_time, value in sorted(self.sums.items())
+            if start <= start_time < end
+        ]
+        return {STAT_ID: rows} if rows else {}
+
+    def get_last_statistics(self, hass, count, stat_id, convert, types):
+        """Return the newest stored sum."""
+        self.queries += 1
+        if not self.sums:
+            return {}
+        last = max(self.sums)
+        return {STAT_ID: [{"start": last.timestamp(), "sum": self.sums[last]}]}
+
+    def install(self) -> None:
+        """Point the importer at this stub."""
+        importer.get_instance = lambda hass: self
+        importer.async_import_statistics = self.import_statistics
+        importer.statistics_during_period = self.statistics_during_period
+        importer.get_last_statistics = self.get_last_statistics
+
+
+class LoopMonitor:
+    """Measures how long the event loop is held up by comparing sleeps with their target."""
+
+    def __init__(self) -> None:
+        """Initialise the monitor."""
+        self.max_block = 0.0
+        self.total_block = 0.0
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(MONITOR_INTERVAL)
+            block = max(0.0, time.perf_counter() - started - MONITOR_INTERVAL)
+            self.max_block = max(self.max_block, block)
+            self.total_block += block
+
+    def start(self) -> None:
+        """Start measuring."""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def async_stop(self) -> None:
+        """Stop measuring."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+async def fetch_browserless(
+    session: ClientSession,
+    servers: FakeServers,
+    date_from: date,
+    date_to: date,
+    recycled: bool,
+) -> dict[str, list[dict[str, Any]]]:
+    """Fetch a range through the Collector's browserless path."""
+    collector = Collector(
+        mains_water_serial=MAINS_SERIAL,
+        sew_username="bench",
+        sew_password="bench",
+        browserless=servers.url,
+        token="",
+        recycled_water_serial=RECYCLED_SERIAL if recycled else "",
+        session=session,
+    )
+    return await collector.async_get_usage(date_from, date_to)
+
+
+async def fetch_aura(
+    session: ClientSession,
+    servers: FakeServers,
+    date_from: date,
+    date_to: date,
+    recycled: bool,
+) -> dict[str, list[dict[str, Any]]]:
+    """Fetch a range straight from the fake aura portal with a saved session."""
+    meters = {"mains": MAINS_SERIAL}
+    if recycled:
+        meters["recycled"] = RECYCLED_SERIAL
+    sew_session = SEWSession(
+        cookies={"sid": "bench"},
+        aura_token="bench",
+        account_num="bench",
+        meter_serial=MAINS_SERIAL,
+    )
+    client = AuraClient(session, servers.url)
+    return parse_usage(
+        await client.async_get_usage(sew_session, meters, date_from, date_to)
+    )
+
+
+async def run_scenario(name: str, args: argparse.Namespace) -> dict[str, Any]:
+    """Run one scenario and return its measurements.
+
+    Arguments:
+        name (str): The scenario name
+        args (argparse.Namespace): The command line options
+
+    Returns:
+        dict[str, Any]: The machine-readable results
+
+    """
+    servers = FakeServers(args.latency, args.cap)
+    await servers.async_start()
+    recorder = StubRecorder()
+    recorder.install()
+    monitor = LoopMonitor()
+
+    date_to = date(2025, 6, 30)
+    date_from = date_to - timedelta(days=args.days - 1)
+    imported_days = 0
+
+    tracemalloc.start()
+    monitor.start()
+    started = time.perf_counter()
+    try:
+        async with ClientSession() as session:
+            if name == "import_out_of_order":
+                # newest chunk first, so every later chunk is rebased
+                days = make_days(date_from, date_to, 1)
+                total, last_hour = None, None
+                for chunk in range(len(days), 0, -args.chunk):
+                    total, last_hour = await importer.async_import_usage(
+                        None,
+                        STAT_ID,
+                        days[max(0, chunk - args.chunk) : chunk],
+                        total,
+                        last_hour,
+                    )
+                imported_days = len(days)
+            else:
+                fetch = fetch_aura if name == "aura" else fetch_browserless
+                total, last_hour = None, None
+                chunk_from = date_from
+                while chunk_from <= date_to:
+                    chunk_to = min(chunk_from + timedelta(days=args.chunk - 1), date_to)
+                    usage = await fetch(
+                        session, servers, chunk_from, chunk_to, args.recycled
+                    )
+                    total, last_hour = await importer.async_import_usage(
+                        None, STAT_ID, usage["mains"], total, last_hour
+                    )
+                    imported_days += len(usage["mains"])
+                    chunk_from = chunk_to + timedelta(days=1)
+    finally:
+        elapsed = time.perf_counter() - started
+        await monitor.async_stop()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        await servers.async_stop()
+
+    return {
+        "scenario": name,
+        "days": imported_days,
+        "latency_s": args.latency,
+        "chunk_days": args.chunk,
+        "recycled": args.recycled,
+        "elapsed_s": round(elapsed, 4),
+        "days_per_second": round(imported_days / elapsed, 1) if elapsed else None,
+        "http_requests": servers.requests,
+        "recorder_calls": recorder.calls,
+        "recorder_calls_per_day": round(recorder.calls / imported_days, 3)
+        if imported_days
+        else None,
+        "statistic_rows": recorder.rows,
+        "peak_memory_kib": round(peak / 1024, 1),
+        "loop_block_ms_max": round(monitor.max_block * 1000, 2),
+        "loop_block_ms_total": round(monitor.total_block * 1000, 2),
+        "python": platform.python_version(),
+    }
+
+
+async def async_main(args: argparse.Namespace) -> list[dict[str, Any]]:
+    """Run the selected scenarios in turn."""
+    dt_util.set_default_time_zone(ZoneInfo(TIME_ZONE))
+    return [await run_scenario(name, args) for name in args.scenarios]
+
+
+def main() -> None:
+    """Parse the command line, run the benchmarks and write the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        default=["browserless", "aura", "import_out_of_order"],
+        choices=["browserless", "aura", "import_out_of_order"],
+    )
+    parser.add_argument(
+        "--days", type=int, default=90, help="days fetched and imported"
+    )
+    parser.add_argument(
+        "--chunk", type=int, default=31, help="days per fetch or import"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.01, help="seconds per fake request"
+    )
+    parser.add_argument(
+        "--cap", type=int, default=31, help="days the fake portal returns per action"
+    )
+    parser.add_argument(
+        "--recycled", action="store_true", help="fetch a recycled meter too"
+    )
+    parser.add_argument(
+        "--output", type=Path, help="append results to a file as JSON lines"
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(async_main(args))
+    lines = "".join(json.dumps(result) + "\n" for result in results)
+    if args.output:
+        with args.output.open("a", encoding="utf-8") as output:
+            output.write(lines)
+    sys.stdout.write(lines)
+
+
+if __name__ == "__main__":
+    main()
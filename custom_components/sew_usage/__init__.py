@@ -1,32 +1,65 @@
 """Support for South East Water Usage, initialisation."""
 
 import logging
-
-from aiohttp.client_exceptions import ClientConnectorError
+import time
 
 from homeassistant import loader
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers import device_registry as dr
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import (
+    config_validation as cv,
+)
+from homeassistant.helpers import (
+    device_registry as dr,
+)
+from homeassistant.helpers import (
+    entity_registry as er,
+)
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.typing import ConfigType
 from homeassistant.loader import async_get_loaded_integration
 
+from .breaker import get_breaker, get_retry_budget
+from .browserless import get_browserless_client
 from .collector import Collector
 from .const import (
+    BILLING_ACCOUNT_ID,
     BROWSERLESS,
     DOMAIN,
     INSTALL_DATE,
     MAINS_WATER_SERIAL,
     RECYCLED_WATER_SERIAL,
+    SETUP_TIME,
+    SEW_URL,
     TOKEN,
+    UNIQUE_ID_PREFIX,
 )
 from .coordinator import SEWDataUpdateCoordinator
 from .data import SEWConfigEntry, SEWData
+from .services import async_setup_services
+from .session import SessionStore
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS = [Platform.SENSOR]
+PLATFORMS = [Platform.BINARY_SENSOR, Platform.SENSOR]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the integration services.
+
+    Arguments:
+        hass (HomeAssistant): The Home Assistant instance.
+        config (ConfigType): The Home Assistant configuration, not used.
+
+    Returns:
+        bool: Whether setup has completed successfully.
+
+    """
+    async_setup_services(hass)
+    return True
 
 
 async def async_migrate_entry(hass: HomeAssistant, entry: SEWConfigEntry) -> bool:
@@ -45,20 +78,43 @@ async def async_migrate_entry(hass: HomeAssistant, entry: SEWConfigEntry) -> boo
     return True
 
 
+async def async_migrate_unique_ids(hass: HomeAssistant, entry: SEWConfigEntry) -> None:
+    """Scope the unique ids of an entry's entities to the entry.
+
+    Unique ids were once only the entity name, so a second entry's entities
+    collided with the first.
+
+    Arguments:
+        hass (HomeAssistant): The Home Assistant instance.
+        entry (ConfigEntry): The integration entry instance.
+
+    """
+    scoped = f"{UNIQUE_ID_PREFIX}{entry.entry_id}_"
+
+    @callback
+    def migrate(entity_entry: er.RegistryEntry) -> dict[str, str] | None:
+        unique_id = entity_entry.unique_id
+        if not unique_id.startswith(UNIQUE_ID_PREFIX) or unique_id.startswith(scoped):
+            return None
+        new_unique_id = scoped + unique_id.removeprefix(UNIQUE_ID_PREFIX)
+        _LOGGER.debug("Migrating unique id %s to %s", unique_id, new_unique_id)
+        return {"new_unique_id": new_unique_id}
+
+    await er.async_migrate_entries(hass, entry.entry_id, migrate)
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: SEWConfigEntry) -> bool:
     """Set up the integration.
 
     * Get and sanitise options.
     * Instantiate the main class.
     * Instantiate the coordinator.
+    * Add the entities from restored state, and start the first refresh in the background.
 
     Arguments:
         hass (HomeAssistant): The Home Assistant instance.
         entry (ConfigEntry): The integration entry instance, contains the configuration.
 
-    Raises:
-        ConfigEntryNotReady: Instructs Home Assistant that the integration is not yet ready when a load failure occurs.
-
     Returns:
         bool: Whether setup has completed successfully.
 
@@ -66,6 +122,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: SEWConfigEntry) -> bool:
 
     # version = await get_version(hass)
 
+    started = time.monotonic()
     options = entry.options
     mains_water_serial = options.get(MAINS_WATER_SERIAL)
     recycled_water_serial = options.get(RECYCLED_WATER_SERIAL)
@@ -82,10 +139,17 @@ async def async_setup_entry(hass: HomeAssistant, entry: SEWConfigEntry) -> bool:
         token=token,
         recycled_water_serial=recycled_water_serial,
         install_date=install_date,
+        session=async_get_clientsession(hass),
+        session_store=SessionStore(hass, sew_username),
+        billing_account_id=options.get(BILLING_ACCOUNT_ID, ""),
+        browserless_client=get_browserless_client(hass, browserless, token),
+        portal_breaker=get_breaker(hass, SEW_URL),
+        retry_budget=get_retry_budget(hass, sew_username),
     )
     coordinator: SEWDataUpdateCoordinator = SEWDataUpdateCoordinator(
-        hass=hass, collector=collector
+        hass=hass, collector=collector, entry=entry
     )
+    await coordinator.async_init()
 
     entry.runtime_data = SEWData(
         coordinator=coordinator,
@@ -95,16 +159,14 @@ async def async_setup_entry(hass: HomeAssistant, entry: SEWConfigEntry) -> bool:
 
     _LOGGER.debug("Successful init")
 
-    opt = {**entry.options}
-    hass.config_entries.async_update_entry(entry, options=opt)
-
-    try:
-        await collector.async_update()
-    except ClientConnectorError as ex:
-        raise ConfigEntryNotReady from ex
+    await async_migrate_unique_ids(hass, entry)
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-    await coordinator.async_refresh()
+    # browserless may be slow or down, so it must not hold up Home Assistant starting
+    entry.async_create_background_task(
+        hass, coordinator.async_startup(), f"{DOMAIN} first refresh"
+    )
+    coordinator.startup[SETUP_TIME] = round((time.monotonic() - started) * 1000)
 
     hass.data.setdefault(DOMAIN, {})
 
@@ -0,0 +1,230 @@
+"""Rolling usage aggregates, updated as each day of readings is imported."""
+
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from datetime import date
+from typing import Any
+
+from .const import (
+    AGGREGATE_DAYS,
+    AGGREGATE_SHORT_DAYS,
+    SENSOR_AVERAGE_MONTH,
+    SENSOR_AVERAGE_WEEK,
+    SENSOR_DAILY_USAGE,
+    SENSOR_HOUR_PROFILE,
+    SENSOR_PEAK_HOUR,
+)
+from .series import HOURS_PER_DAY
+
+
+class UsageAggregates:
+    """Daily totals and an hour-of-day profile over the last AGGREGATE_DAYS days.
+
+    The days are held in fixed-size ring buffers with running sums, so adding a
+    day updates every aggregate in constant time per reading rather than
+    rescanning the history.
+    """
+
+    def __init__(
+        self, days: int = AGGREGATE_DAYS, short_days: int = AGGREGATE_SHORT_DAYS
+    ) -> None:
+        """Initialise empty aggregates.
+
+        Arguments:
+            days (int, optional): The days kept for the long average and the profile. Defaults to AGGREGATE_DAYS.
+            short_days (int, optional): The days in the short average. Defaults to AGGREGATE_SHORT_DAYS.
+
+        """
+        self.days: int = days
+        self.short_days: int = short_days
+        self.dates: deque[date] = deque(maxlen=days)
+        self.totals: deque[float] = deque(maxlen=days)
+        self._hours: array = array("d", [0.0] * days * HOURS_PER_DAY)
+        self._hour_sums: array = array("d", [0.0] * HOURS_PER_DAY)
+        self._next_slot: int = 0
+        self._sum: float = 0.0
+        self._short_sum: float = 0.0
+        self.peak_litres: float | None = None
+        self.peak_hour: int | None = None
+
+    def add_day(self, day_date: date, readings: list[float | None]) -> None:
+        """Add the next day of readings, dropping the oldest day once the buffers are full.
+
+        Days older than the latest day are ignored, and the latest day replaces itself,
+        so backfills and repeated imports do not distort the aggregates.
+
+        Arguments:
+            day_date (date): The local date of the readings
+            readings (list[float | None]): The hourly readings, None where SEW had no reading
+
+        """
+        if self.dates and day_date < self.dates[-1]:
+            return
+        if self.dates and day_date == self.dates[-1]:
+            self._remove_latest()
+
+        if len(self.dates) == self.days:
+            self._remove_slot(self._next_slot)
+        if len(self.totals) >= self.short_days:
+            self._short_sum -= self.totals[-self.short_days]
+
+        first = self._next_slot * HOURS_PER_DAY
+        total = 0.0
+        self.peak_litres, self.peak_hour = None, None
+        for hour in range(HOURS_PER_DAY):
+            litres = readings[hour] if hour < len(readings) else None
+            litres = litres or 0.0
+            self._hours[first + hour] = litres
+            self._hour_sums[hour] += litres
+            total += litres
+            if self.peak_litres is None or litres > self.peak_litres:
+                self.peak_litres, self.peak_hour = litres, hour
+
+        self.dates.append(day_date)
+        self.totals.append(total)
+        self._sum += total
+        self._short_sum += total
+        self._next_slot = (self._next_slot + 1) % self.days
+
+    def _remove_slot(self, slot: int) -> None:
+        """Take a day's readings out of the running sums.
+
+        Arguments:
+            slot (int): The ring buffer slot of the day
+
+        """
+        first = slot * HOURS_PER_DAY
+        for hour in range(HOURS_PER_DAY):
+            self._hour_sums[hour] -= self._hours[first + hour]
+        self._sum -= self.totals[0]
+
+    def _remove_latest(self) -> None:
+        """Take the latest day out of the buffers, so it can be added again."""
+        self._next_slot = (self._next_slot - 1) % self.days
+        first = self._next_slot * HOURS_PER_DAY
+        for hour in range(HOURS_PER_DAY):
+            self._hour_sums[hour] -= self._hours[first + hour]
+        total = self.totals.pop()
+        self.dates.pop()
+        self._sum -= total
+        self._short_sum -= total
+        if len(self.totals) >= self.short_days:
+            self._short_sum += self.totals[-self.short_days]
+
+    @property
+    def latest_total(self) -> float | None:
+        """Return the total of the latest day.
+
+        Returns:
+            float | None: The litres used, or None before any day is added
+
+        """
+        return round(self.totals[-1], 1) if self.totals else None
+
+    @property
+    def short_average(self) -> float | None:
+        """Return the average daily total over the last short_days days.
+
+        Returns:
+            float | None: The average litres per day, or None before any day is added
+
+        """
+        count = min(len(self.totals), self.short_days)
+        return round(self._short_sum / count, 1) if count else None
+
+    @property
+    def average(self) -> float | None:
+        """Return the average daily total over every day kept.
+
+        Returns:
+            float | None: The average litres per day, or None before any day is added
+
+        """
+        return round(self._sum / len(self.totals), 1) if self.totals else None
+
+    @property
+    def profile(self) -> list[float]:
+        """Return the average litres used in each hour of the day over the days kept.
+
+        Returns:
+            list[float]: 24 averages, from midnight
+
+        """
+        count = len(self.totals) or 1
+        return [round(litres / count, 1) for litres in self._hour_sums]
+
+    @property
+    def busiest_hour(self) -> int | None:
+        """Return the hour of the day with the highest average use.
+
+        Returns:
+            int | None: The hour, from 0 to 23, or None before any day is added
+
+        """
+        if not self.totals:
+            return None
+        return max(range(HOURS_PER_DAY), key=self._hour_sums.__getitem__)
+
+    def get_value(self, name: str) -> float | int | None:
+        """Return the value shown by an aggregate's sensor.
+
+        Arguments:
+            name (str): The sensor key
+
+        Returns:
+            float | int | None: The aggregate, or None before any day is added
+
+        """
+        if name == SENSOR_DAILY_USAGE:
+            return self.latest_total
+        if name == SENSOR_AVERAGE_WEEK:
+            return self.short_average
+        if name == SENSOR_AVERAGE_MONTH:
+            return self.average
+        if name == SENSOR_PEAK_HOUR:
+            return self.peak_litres
+        if name == SENSOR_HOUR_PROFILE:
+            return self.busiest_hour
+        raise KeyError(name)
+
+    def get_attributes(self, name: str) -> dict[str, Any]:
+        """Return the sensor attributes of an aggregate.
+
+        Arguments:
+            name (str): The sensor key
+
+        Returns:
+            dict[str, Any]: The date and days covered, plus the hour or profile where relevant
+
+        """
+        attributes: dict[str, Any] = {
+            "date": self.dates[-1].isoformat() if self.dates else None,
+            "days": len(self.dates),
+        }
+        if name == SENSOR_AVERAGE_WEEK:
+            attributes["days"] = min(len(self.dates), self.short_days)
+        elif name == SENSOR_PEAK_HOUR:
+            attributes["hour"] = self.peak_hour
+        elif name == SENSOR_HOUR_PROFILE:
+            attributes["profile"] = self.profile
+        return attributes
+
+    def get_values(self) -> dict[str, Any]:
+        """Return the aggregates for diagnostics.
+
+        Returns:
+            dict[str, Any]: Every aggregate and the dates covered
+
+        """
+        return {
+            "latest_date": self.dates[-1].isoformat() if self.dates else None,
+            "latest_total": self.latest_total,
+            "short_average": self.short_average,
+            "average": self.average,
+            "peak_hour": self.peak_hour,
+            "peak_litres": self.peak_litres,
+            "profile": self.profile,
+            "days": len(self.dates),
+        }
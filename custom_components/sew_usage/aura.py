@@ -0,0 +1,536 @@
+"""Direct HTTP client for the SEW portal, logging in and calling aura without a browser."""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from http.cookies import SimpleCookie
+from typing import Any
+from urllib.parse import unquote, urljoin
+
+import aiohttp
+
+from .const import (
+    AURA_APP_LOADED,
+    AURA_FWUID,
+    AURA_PAGE_URI,
+    FETCH_TIMEOUT,
+    MAX_RANGE_DAYS,
+    METRIC_AURA_LATENCY,
+    METRIC_BYTES_RECEIVED,
+    SEW_URL,
+)
+from .metrics import FetchMetrics
+from .session import SEWSession
+
+_LOGGER = logging.getLogger(__name__)
+
+AURA_PATH = "/s/sfsites/aura"
+LOGIN_PAGE_URI = "/s/login/"
+AURA_DESCRIPTOR = "aura://ApexActionController/ACTION$execute"
+AURA_CLASSNAME = "MysewUsageBillingGraphController"
+AURA_METHOD = "getUsageData"
+AURA_HEADERS = {
+    "accept": "*/*",
+    "x-sfdc-lds-endpoints": f"ApexActionController.execute:{AURA_CLASSNAME}.{AURA_METHOD}",
+}
+INVALID_SESSION_EVENTS = ("aura:invalidSession", "aura:clientOutOfSync")
+LOGIN_DESCRIPTOR = "apex://LightningLoginFormController/ACTION$login"
+MAX_REDIRECTS = 10
+MAX_ACTIONS = 12
+
+FWUID_RE = re.compile(r'"fwuid"\s*:\s*"([^"]+)"')
+LOADED_RE = re.compile(r'"APPLICATION@markup://siteforce:communityApp"\s*:\s*"([^"]+)"')
+TOKEN_RE = re.compile(r'"token"\s*:\s*"([^"]+)"')
+BOOTSTRAP_RE = re.compile(r'src="([^"]*/bootstrap\.js[^"]*)"')
+
+
+class AuraError(Exception):
+    """The aura endpoint returned an error."""
+
+
+class SessionExpired(AuraError):
+    """The portal rejected the saved session or aura token."""
+
+
+class LoginFailed(AuraError):
+    """The portal did not accept the SEW username and password."""
+
+
+@dataclass
+class UsageRequest:
+    """One meter and date range requested in an aura message."""
+
+    meter: str
+    meter_serial: str
+    date_from: date
+    date_to: date
+
+
+def build_action(action_id: str, request: UsageRequest, account_num: str) -> dict:
+    """Build one getUsageData aura action.
+
+    Arguments:
+        action_id (str): The id used to match the action in the response
+        request (UsageRequest): The meter and date range requested
+        account_num (str): The SEW internal billing account id
+
+    Returns:
+        dict: The aura action
+
+    """
+    return {
+        "id": action_id,
+        "descriptor": AURA_DESCRIPTOR,
+        "callingDescriptor": "UNKNOWN",
+        "params": {
+            "namespace": "",
+            "classname": AURA_CLASSNAME,
+            "method": AURA_METHOD,
+            "params": {
+                "baId": account_num,
+                "meterId": request.meter_serial,
+                "dateFrom": request.date_from.isoformat(),
+                "dateTo": request.date_to.isoformat(),
+                "resolution": "hourly",
+            },
+            "cacheable": False,
+            "isContinuation": False,
+        },
+    }
+
+
+def build_message(requests: dict[str, UsageRequest], account_num: str) -> str:
+    """Build an aura message carrying one getUsageData action per request.
+
+    Arguments:
+        requests (dict[str, UsageRequest]): The requests, keyed by action id
+        account_num (str): The SEW internal billing account id
+
+    Returns:
+        str: The JSON encoded aura message
+
+    """
+    return json.dumps(
+        {
+            "actions": [
+                build_action(action_id, request, account_num)
+                for action_id, request in requests.items()
+            ]
+        },
+        separators=(",", ":"),
+    )
+
+
+def build_context(fwuid: str = AURA_FWUID, loaded: str = AURA_APP_LOADED) -> str:
+    """Build the aura context identifying the community app.
+
+    Arguments:
+        fwuid (str, optional): The aura framework id. Defaults to AURA_FWUID.
+        loaded (str, optional): The loaded app hash. Defaults to AURA_APP_LOADED.
+
+    Returns:
+        str: The JSON encoded aura context
+
+    """
+    return json.dumps(
+        {
+            "mode": "PROD",
+            "fwuid": fwuid,
+            "app": "siteforce:communityApp",
+            "loaded": {"APPLICATION@markup://siteforce:communityApp": loaded},
+            "dn": [],
+            "globals": {"srcdoc": True},
+            "uad": True,
+        },
+        separators=(",", ":"),
+    )
+
+
+def decode_response(text: str) -> dict[str, Any]:
+    """Decode a raw aura response.
+
+    Arguments:
+        text (str): The raw aura response
+
+    Raises:
+        SessionExpired: When the portal rejected the session or token
+
+    Returns:
+        dict[str, Any]: The decoded response
+
+    """
+    text = text.removeprefix("while(1);")
+    if any(event in text for event in INVALID_SESSION_EVENTS):
+        raise SessionExpired("Aura session rejected")
+
+    try:
+        return json.loads(text)
+    except ValueError as ex:
+        # the portal answers an expired session with the login page rather than JSON
+        raise SessionExpired("Aura response is not JSON") from ex
+
+
+def parse_response(text: str) -> dict[str, list[dict[str, Any]]]:
+    """Return the days of usage from an aura response, per action id.
+
+    Arguments:
+        text (str): The raw aura response
+
+    Raises:
+        SessionExpired: When the portal rejected the session or token
+        AuraError: When an action failed
+
+    Returns:
+        dict[str, list[dict[str, Any]]]: The days of usage returned, keyed by action id
+
+    """
+    returned = {}
+    for action in decode_response(text)["actions"]:
+        if action.get("state") != "SUCCESS":
+            raise AuraError(
+                f"Aura action {action.get('id')} failed: {action.get('error')}"
+            )
+        returned[action["id"]] = action["returnValue"]["returnValue"] or []
+    return returned
+
+
+def format_cookies(cookies: dict[str, str]) -> str:
+    """Return cookies as a Cookie header value.
+
+    Arguments:
+        cookies (dict[str, str]): The cookies
+
+    Returns:
+        str: The Cookie header value
+
+    """
+    return "; ".join(f"{name}={value}" for name, value in cookies.items())
+
+
+def merge_cookies(cookies: dict[str, str], response: aiohttp.ClientResponse) -> None:
+    """Add the cookies set by a response to a cookie dictionary.
+
+    Arguments:
+        cookies (dict[str, str]): The cookies collected so far
+        response (aiohttp.ClientResponse): The response
+
+    """
+    for header in response.headers.getall("Set-Cookie", []):
+        for name, morsel in SimpleCookie(header).items():
+            if morsel.value:
+                cookies[name] = morsel.value
+            else:
+                cookies.pop(name, None)
+
+
+class AuraClient:
+    """Logs in to the SEW community portal and calls aura over plain HTTP."""
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        base_url: str = SEW_URL,
+        metrics: FetchMetrics | None = None,
+    ) -> None:
+        """Initialise the client.
+
+        Arguments:
+            session (aiohttp.ClientSession): The HTTP session
+            base_url (str, optional): The portal URL, e.g. a local stand-in portal. Defaults to SEW_URL.
+            metrics (FetchMetrics, optional): Where to record aura latency and response sizes. Defaults to None.
+
+        """
+        self._session: aiohttp.ClientSession = session
+        self.base_url: str = base_url.rstrip("/")
+        self.metrics: FetchMetrics | None = metrics
+        self.timings: list[int] = []
+        self._action_id: int = 0
+
+    async def _async_get(self, path: str, cookies: dict[str, str]) -> str:
+        """Get a portal page, following redirects and collecting the cookies set on the way.
+
+        Arguments:
+            path (str): The path or absolute URL to get
+            cookies (dict[str, str]): The cookies to send, updated in place
+
+        Raises:
+            AuraError: When the page could not be retrieved
+
+        Returns:
+            str: The page body
+
+        """
+        url = urljoin(self.base_url + "/", path)
+        for _ in range(MAX_REDIRECTS):
+            async with self._session.get(
+                url,
+                headers={"Cookie": format_cookies(cookies)},
+                timeout=aiohttp.ClientTimeout(total=FETCH_TIMEOUT),
+                allow_redirects=False,
+            ) as response:
+                merge_cookies(cookies, response)
+                if response.status in (301, 302, 303, 307, 308):
+                    url = urljoin(url, response.headers["Location"])
+                    continue
+                response.raise_for_status()
+                return await response.text()
+        raise AuraError(f"Too many redirects getting {path}")
+
+    async def _async_post(
+        self,
+        message: str,
+        cookies: dict[str, str],
+        aura_token: str,
+        page_uri: str,
+        fwuid: str,
+        loaded: str,
+        headers: dict[str, str] | None = None,
+    ) -> str:
+        """Post an aura message.
+
+        Arguments:
+            message (str): The JSON encoded aura message
+            cookies (dict[str, str]): The cookies to send, updated in place
+            aura_token (str): The aura token, or "null" before login
+            page_uri (str): The page the action is called from
+            fwuid (str): The aura framework id
+            loaded (str): The loaded app hash
+            headers (dict[str, str], optional): Extra request headers. Defaults to None.
+
+        Raises:
+            SessionExpired: When the portal rejected the session
+
+        Returns:
+            str: The raw aura response
+
+        """
+        form = {
+            "message": message,
+            "aura.context": build_context(fwuid, loaded),
+            "aura.pageURI": page_uri,
+            "aura.token": aura_token,
+        }
+        async with self._session.post(
+            f"{self.base_url}{AURA_PATH}",
+            params={"r": "26", "aura.ApexAction.execute": "1"},
+            data=form,
+            headers={**(headers or {}), "Cookie": format_cookies(cookies)},
+            timeout=aiohttp.ClientTimeout(total=FETCH_TIMEOUT),
+            allow_redirects=False,
+        ) as response:
+            if response.status in (301, 302, 401, 403):
+                raise SessionExpired(f"Aura request returned {response.status}")
+            response.raise_for_status()
+            merge_cookies(cookies, response)
+            text = await response.text()
+        if self.metrics is not None:
+            self.metrics.record(METRIC_BYTES_RECEIVED, len(text))
+        return text
+
+    async def async_discover(
+        self, path: str, cookies: dict[str, str]
+    ) -> dict[str, str]:
+        """Discover the aura framework id, app hash and token from a portal page.
+
+        Arguments:
+            path (str): The page to read
+            cookies (dict[str, str]): The cookies to send, updated in place
+
+        Returns:
+            dict[str, str]: The fwuid, loaded and token found, falling back to the known framework ids
+
+        """
+        raw_page = await self._async_get(path, cookies)
+        page = unquote(raw_page)
+        found = {"fwuid": AURA_FWUID, "loaded": AURA_APP_LOADED}
+        if match := FWUID_RE.search(page):
+            found["fwuid"] = match.group(1)
+        if match := LOADED_RE.search(page):
+            found["loaded"] = match.group(1)
+
+        if (match := TOKEN_RE.search(page)) is None and (
+            bootstrap := BOOTSTRAP_RE.search(raw_page)
+        ):
+            # the token is delivered by the app bootstrap rather than the page itself
+            match = TOKEN_RE.search(
+                unquote(await self._async_get(bootstrap.group(1), cookies))
+            )
+        if match:
+            found["token"] = match.group(1)
+        return found
+
+    async def async_login(
+        self, username: str, password: str, account_num: str, meter_serial: str
+    ) -> SEWSession:
+        """Log in to the portal and return a session for aura calls.
+
+        Arguments:
+            username (str): The SEW username
+            password (str): The SEW password
+            account_num (str): The SEW internal billing account id
+            meter_serial (str): The SEW internal meter id
+
+        Raises:
+            LoginFailed: When the portal rejected the username or password
+            AuraError: When no aura token could be found after logging in
+
+        Returns:
+            SEWSession: The logged in session
+
+        """
+        cookies: dict[str, str] = {}
+        login_page = await self.async_discover(LOGIN_PAGE_URI, cookies)
+
+        message = json.dumps(
+            {
+                "actions": [
+                    {
+                        "id": "1;a",
+                        "descriptor": LOGIN_DESCRIPTOR,
+                        "callingDescriptor": "markup://salesforceIdentity:loginForm2",
+                        "params": {
+                            "username": username,
+                            "password": password,
+                            "startUrl": AURA_PAGE_URI,
+                        },
+                    }
+                ]
+            },
+            separators=(",", ":"),
+        )
+        data = decode_response(
+            await self._async_post(
+                message,
+                cookies,
+                "null",
+                LOGIN_PAGE_URI,
+                login_page["fwuid"],
+                login_page["loaded"],
+            )
+        )
+
+        redirect = None
+        for event in data.get("events", []):
+            if event.get("descriptor") == "markup://aura:clientRedirect":
+                redirect = event["attributes"]["values"]["url"]
+        if redirect is None:
+            action = data["actions"][0]
+            raise LoginFailed(str(action.get("returnValue") or action.get("error")))
+
+        # the redirect passes through frontdoor, which sets the session cookies
+        await self._async_get(redirect, cookies)
+        usage_page = await self.async_discover(AURA_PAGE_URI, cookies)
+        if "token" not in usage_page:
+            raise AuraError("No aura token found after logging in")
+
+        return SEWSession(
+            cookies=cookies,
+            aura_token=usage_page["token"],
+            account_num=account_num,
+            meter_serial=meter_serial,
+            expires=SEWSession.get_expiry(),
+            fwuid=usage_page["fwuid"],
+            loaded=usage_page["loaded"],
+        )
+
+    async def async_get_usage(
+        self,
+        sew_session: SEWSession,
+        meters: dict[str, str],
+        date_from: date,
+        date_to: date,
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Get every day from date_from to date_to for several meters.
+
+        The range is split into chunks of MAX_RANGE_DAYS, and every meter and chunk is
+        requested as one action of a single aura message. Any chunk the portal caps is
+        requested again from the day after the last one returned.
+
+        Arguments:
+            sew_session (SEWSession): The logged in session
+            meters (dict[str, str]): The SEW internal meter ids, keyed by mains and recycled
+            date_from (date): The first date requested
+            date_to (date): The last date requested
+
+        Raises:
+            SessionExpired: When the portal rejected the session
+
+        Returns:
+            dict[str, list[dict[str, Any]]]: The days of usage in date order, keyed by mains and recycled
+
+        """
+        days: dict[str, dict[str, dict[str, Any]]] = {meter: {} for meter in meters}
+        pending: list[UsageRequest] = []
+        chunk_from = date_from
+        while chunk_from <= date_to:
+            chunk_to = min(chunk_from + timedelta(days=MAX_RANGE_DAYS - 1), date_to)
+            pending.extend(
+                UsageRequest(meter, meter_serial, chunk_from, chunk_to)
+                for meter, meter_serial in meters.items()
+            )
+            chunk_from = chunk_to + timedelta(days=1)
+
+        self.timings = []
+        while pending:
+            batch = pending[:MAX_ACTIONS]
+            pending = pending[MAX_ACTIONS:]
+            requests = {f"{self._next_id()};a": request for request in batch}
+
+            started = time.monotonic()
+            returned = parse_response(
+                await self._async_post(
+                    build_message(requests, sew_session.account_num),
+                    sew_session.cookies,
+                    sew_session.aura_token,
+                    AURA_PAGE_URI,
+                    sew_session.fwuid,
+                    sew_session.loaded,
+                    AURA_HEADERS,
+                )
+            )
+            self.timings.append(round((time.monotonic() - started) * 1000))
+            if self.metrics is not None:
+                self.metrics.record(METRIC_AURA_LATENCY, self.timings[-1])
+
+            for action_id, request in requests.items():
+                last_date = None
+                for day in returned.get(action_id, []):
+                    day_date = date.fromisoformat(day["apiDate"][:10])
+                    days[request.meter][day_date.isoformat()] = day
+                    last_date = (
+                        day_date if last_date is None else max(last_date, day_date)
+                    )
+
+                if (
+                    last_date is not None
+                    and request.date_from <= last_date < request.date_to
+                ):
+                    # the portal capped this chunk, so continue from the day after the last returned
+                    pending.append(
+                        UsageRequest(
+                            request.meter,
+                            request.meter_serial,
+                            last_date + timedelta(days=1),
+                            request.date_to,
+                        )
+                    )
+
+        return {
+            meter: [meter_days[key] for key in sorted(meter_days)]
+            for meter, meter_days in days.items()
+        }
+
+    def _next_id(self) -> int:
+        """Return the next aura action number.
+
+        Returns:
+            int: The action number
+
+        """
+        self._action_id += 1
+        return self._action_id
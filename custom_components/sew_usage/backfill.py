@@ -0,0 +1,137 @@
+"""Plan and track backfills of days missing from statistics."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any
+
+from .const import BACKFILL_MERGE_GAP, MAX_RANGE_DAYS
+
+BACKFILL_IDLE = "idle"
+BACKFILL_RUNNING = "running"
+BACKFILL_COMPLETE = "complete"
+BACKFILL_FAILED = "failed"
+
+
+def plan_backfill(
+    missing: list[date],
+    max_days: int = MAX_RANGE_DAYS,
+    merge_gap: int = BACKFILL_MERGE_GAP,
+) -> list[tuple[date, date]]:
+    """Group missing dates into as few fetch ranges as possible.
+
+    Runs of missing dates separated by no more than merge_gap present days are
+    fetched together, since one more day in a range is cheaper than another login.
+
+    Arguments:
+        missing (list[date]): The missing dates, in order
+        max_days (int, optional): The longest range to fetch at once. Defaults to MAX_RANGE_DAYS.
+        merge_gap (int, optional): The most present days to fetch across. Defaults to BACKFILL_MERGE_GAP.
+
+    Returns:
+        list[tuple[date, date]]: The first and last date of each range, in order
+
+    """
+    ranges: list[tuple[date, date]] = []
+    for day_date in missing:
+        if ranges:
+            range_from, range_to = ranges[-1]
+            if (day_date - range_to).days <= merge_gap + 1 and (
+                day_date - range_from
+            ).days < max_days:
+                ranges[-1] = (range_from, day_date)
+                continue
+        ranges.append((day_date, day_date))
+    return ranges
+
+
+@dataclass
+class BackfillProgress:
+    """Progress of the current or last backfill."""
+
+    state: str = BACKFILL_IDLE
+    total_days: int = 0
+    done_days: int = 0
+    ranges: list[tuple[date, date]] = field(default_factory=list)
+    current: tuple[date, date] | None = None
+    error: str | None = None
+
+    def start(self, missing: list[date], ranges: list[tuple[date, date]]) -> None:
+        """Start tracking a new backfill.
+
+        Arguments:
+            missing (list[date]): The missing dates
+            ranges (list[tuple[date, date]]): The planned fetch ranges
+
+        """
+        self.state = BACKFILL_RUNNING if ranges else BACKFILL_COMPLETE
+        self.total_days = len(missing)
+        self.done_days = 0
+        self.ranges = ranges
+        self.current = None
+        self.error = None
+
+    @property
+    def percent(self) -> float:
+        """Return how much of the backfill has completed.
+
+        Returns:
+            float: The percentage of missing days filled
+
+        """
+        if self.total_days == 0:
+            return 100.0
+        return round(100 * self.done_days / self.total_days, 1)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the progress as sensor attributes.
+
+        Returns:
+            dict[str, Any]: The progress details
+
+        """
+        return {
+            "state": self.state,
+            "total_days": self.total_days,
+            "done_days": self.done_days,
+            "remaining_ranges": len(self.ranges),
+            "current_range": (
+                f"{self.current[0].isoformat()} - {self.current[1].isoformat()}"
+                if self.current
+                else None
+            ),
+            "error": self.error,
+        }
+
+
+def count_missing_in(missing: list[date], date_from: date, date_to: date) -> int:
+    """Return how many missing dates fall within a range.
+
+    Arguments:
+        missing (list[date]): The missing dates
+        date_from (date): The first date of the range
+        date_to (date): The last date of the range
+
+    Returns:
+        int: The number of missing dates in the range
+
+    """
+    return sum(1 for day_date in missing if date_from <= day_date <= date_to)
+
+
+def dates_between(date_from: date, date_to: date) -> list[date]:
+    """Return every date in a range.
+
+    Arguments:
+        date_from (date): The first date
+        date_to (date): The last date
+
+    Returns:
+        list[date]: The dates, in order
+
+    """
+    return [
+        date_from + timedelta(days=offset)
+        for offset in range((date_to - date_from).days + 1)
+    ]
@@ -0,0 +1,121 @@
+"""Support for South East Water Binary Sensors."""
+
+from __future__ import annotations
+
+import logging
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+    BinarySensorEntityDescription,
+)
+from homeassistant.const import (
+    ATTR_CONFIGURATION_URL,
+    ATTR_IDENTIFIERS,
+    ATTR_MANUFACTURER,
+    ATTR_MODEL,
+    ATTR_NAME,
+    ATTR_SW_VERSION,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import (
+    ATTR_ENTRY_TYPE,
+    ATTRIBUTION,
+    DOMAIN,
+    MANUFACTURER,
+    SENSOR_LEAK,
+    UNIQUE_ID_PREFIX,
+)
+from .coordinator import SEWDataUpdateCoordinator
+from .data import SEWConfigEntry
+
+_LOGGER = logging.getLogger(__name__)
+
+BINARY_SENSORS: dict[str, BinarySensorEntityDescription] = {
+    SENSOR_LEAK: BinarySensorEntityDescription(
+        key=SENSOR_LEAK,
+        translation_key="leak_detected",
+        name="Possible Leak",
+        icon="mdi:pipe-leak",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+    ),
+}
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: SEWConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Add binary sensors for passed entry in HA.
+
+    Arguments:
+        hass (HomeAssistant): The Home Assistant instance.
+        entry (ConfigEntry): The integration entry instance, contains the configuration.
+        async_add_entities (AddEntitiesCallback): The Home Assistant callback to add entities.
+
+    """
+    coordinator: SEWDataUpdateCoordinator = entry.runtime_data.coordinator
+    async_add_entities(
+        [SEWLeakSensor(coordinator, BINARY_SENSORS[SENSOR_LEAK], entry)],
+        update_before_add=False,
+    )
+
+
+class SEWLeakSensor(CoordinatorEntity[SEWDataUpdateCoordinator], BinarySensorEntity):
+    """Whether the imported mains readings suggest a leak."""
+
+    _attr_attribution = ATTRIBUTION
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: SEWDataUpdateCoordinator,
+        entity_description: BinarySensorEntityDescription,
+        entry: SEWConfigEntry,
+    ) -> None:
+        """Initialise Binary Sensor."""
+        super().__init__(coordinator)
+
+        self.entity_description = entity_description
+        self._coordinator: SEWDataUpdateCoordinator = coordinator
+        self._attr_unique_id = (
+            f"{UNIQUE_ID_PREFIX}{entry.entry_id}_{entity_description.name}"
+        )
+        self._attr_device_info = {
+            ATTR_IDENTIFIERS: {(DOMAIN, entry.entry_id)},
+            ATTR_NAME: "South East Water",
+            ATTR_MANUFACTURER: MANUFACTURER,
+            ATTR_MODEL: "South East Water",
+            ATTR_ENTRY_TYPE: DeviceEntryType.SERVICE,
+            ATTR_SW_VERSION: coordinator.get_version,
+            ATTR_CONFIGURATION_URL: "https://portal.api.SEW.vic.gov.au/",
+        }
+        self._update_state()
+
+    def _update_state(self) -> None:
+        """Read the leak detector state."""
+        leaks = self._coordinator.leaks
+        self._attr_available = leaks.last_date is not None
+        self._attr_is_on = leaks.detected
+        self._attr_extra_state_attributes = leaks.get_attributes()
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Handle updated data from the coordinator."""
+        self._update_state()
+        self.async_write_ha_state()
+
+    @property
+    def name(self):
+        """Return the name of the device.
+
+        Returns:
+            str: The device name.
+
+        """
+        return f"{self.entity_description.name}"
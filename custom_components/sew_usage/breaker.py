@@ -0,0 +1,256 @@
+"""Circuit breakers and a daily retry budget for the SEW portal and browserless."""
+
+from __future__ import annotations
+
+import logging
+import random
+import time
+from datetime import date
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    BREAKER_BASE_DELAY,
+    BREAKER_JITTER,
+    BREAKER_MAX_DELAY,
+    BREAKER_THRESHOLD,
+    BREAKERS,
+    DAILY_LOGIN_BUDGET,
+    DOMAIN,
+    RETRY_BUDGETS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+
+class CircuitOpen(Exception):
+    """An endpoint is failing, so requests to it are held back for a while."""
+
+
+class BudgetExhausted(Exception):
+    """Today's logins for an account have all been used."""
+
+
+def get_breaker(hass: HomeAssistant, name: str) -> CircuitBreaker:
+    """Return the shared breaker for an endpoint, creating it on first use.
+
+    Arguments:
+        hass (HomeAssistant): The Home Assistant instance.
+        name (str): The endpoint the breaker guards
+
+    Returns:
+        CircuitBreaker: The breaker every config entry uses for this endpoint
+
+    """
+    breakers: dict[str, CircuitBreaker] = hass.data.setdefault(DOMAIN, {}).setdefault(
+        BREAKERS, {}
+    )
+    if name not in breakers:
+        breakers[name] = CircuitBreaker(name)
+    return breakers[name]
+
+
+def get_retry_budget(hass: HomeAssistant, username: str) -> RetryBudget:
+    """Return the shared daily login budget for an account, creating it on first use.
+
+    Arguments:
+        hass (HomeAssistant): The Home Assistant instance.
+        username (str): The SEW username
+
+    Returns:
+        RetryBudget: The budget every config entry uses for this account
+
+    """
+    budgets: dict[str, RetryBudget] = hass.data.setdefault(DOMAIN, {}).setdefault(
+        RETRY_BUDGETS, {}
+    )
+    if username not in budgets:
+        budgets[username] = RetryBudget()
+    return budgets[username]
+
+
+class CircuitBreaker:
+    """Stops calling an endpoint after repeated failures, then probes it with backoff.
+
+    After BREAKER_THRESHOLD consecutive failures the breaker opens and every request
+    is refused until the backoff passes. Then one probe request is let through: if
+    it succeeds the breaker closes, and if it fails the breaker opens again for
+    twice as long, up to BREAKER_MAX_DELAY, with random jitter so several entries
+    do not probe together.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        threshold: int = BREAKER_THRESHOLD,
+        base_delay: float = BREAKER_BASE_DELAY,
+        max_delay: float = BREAKER_MAX_DELAY,
+    ) -> None:
+        """Initialise a closed breaker.
+
+        Arguments:
+            name (str): The endpoint the breaker guards, for logs and repairs
+            threshold (int, optional): Consecutive failures before opening. Defaults to BREAKER_THRESHOLD.
+            base_delay (float, optional): Seconds to stay open the first time. Defaults to BREAKER_BASE_DELAY.
+            max_delay (float, optional): The most seconds to stay open. Defaults to BREAKER_MAX_DELAY.
+
+        """
+        self.name: str = name
+        self.threshold: int = threshold
+        self.base_delay: float = base_delay
+        self.max_delay: float = max_delay
+        self.state: str = BREAKER_CLOSED
+        self.failures: int = 0
+        self.trips: int = 0
+        self.retry_at: float = 0.0
+        self.last_error: str | None = None
+
+    @property
+    def is_open(self) -> bool:
+        """Return whether the breaker is holding requests back or probing.
+
+        Returns:
+            bool: True unless the breaker is closed
+
+        """
+        return self.state != BREAKER_CLOSED
+
+    def check(self) -> None:
+        """Let a request through, or refuse it while the breaker is open.
+
+        Raises:
+            CircuitOpen: When the endpoint is still backing off, or a probe is already running
+
+        """
+        if self.state == BREAKER_CLOSED:
+            return
+        if time.time() >= self.retry_at:
+            _LOGGER.debug("Probing %s after backing off", self.name)
+            self.state = BREAKER_HALF_OPEN
+            # another probe is allowed if this one never reports back
+            self.retry_at = time.time() + self.base_delay
+            return
+        raise CircuitOpen(
+            f"{self.name} is failing, next attempt after {self.get_retry_time()}"
+        )
+
+    def record_success(self) -> None:
+        """Close the breaker after a request succeeds."""
+        if self.state != BREAKER_CLOSED:
+            _LOGGER.info("%s is working again", self.name)
+        self.state = BREAKER_CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.last_error = None
+
+    def record_failure(self, error: Exception | str) -> None:
+        """Count a failed request, opening the breaker once there are enough in a row.
+
+        Arguments:
+            error (Exception | str): What went wrong
+
+        """
+        self.failures += 1
+        self.last_error = str(error) or type(error).__name__
+        if self.state != BREAKER_HALF_OPEN and self.failures < self.threshold:
+            return
+        self.trips += 1
+        delay = min(self.max_delay, self.base_delay * 2 ** (self.trips - 1))
+        delay *= 1 + random.uniform(-BREAKER_JITTER, BREAKER_JITTER)
+        self.retry_at = time.time() + delay
+        self.state = BREAKER_OPEN
+        _LOGGER.warning(
+            "%s failed %d times in a row, pausing requests until %s: %s",
+            self.name,
+            self.failures,
+            self.get_retry_time(),
+            self.last_error,
+        )
+
+    def get_retry_time(self) -> str:
+        """Return when the breaker lets the next request through.
+
+        Returns:
+            str: The local time of the next probe, in ISO format
+
+        """
+        return dt_util.as_local(dt_util.utc_from_timestamp(self.retry_at)).isoformat(
+            timespec="seconds"
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the breaker state for diagnostics.
+
+        Returns:
+            dict[str, Any]: The state, failure counts and next probe time
+
+        """
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "trips": self.trips,
+            "retry_at": self.get_retry_time() if self.is_open else None,
+            "last_error": self.last_error,
+        }
+
+
+class RetryBudget:
+    """Counts the logins made for one account each day, up to a daily limit."""
+
+    def __init__(self, limit: int = DAILY_LOGIN_BUDGET) -> None:
+        """Initialise a full budget.
+
+        Arguments:
+            limit (int, optional): The logins allowed each day. Defaults to DAILY_LOGIN_BUDGET.
+
+        """
+        self.limit: int = limit
+        self.day: date | None = None
+        self.used: int = 0
+
+    @property
+    def remaining(self) -> int:
+        """Return the logins left today.
+
+        Returns:
+            int: The unused logins
+
+        """
+        if self.day != dt_util.now().date():
+            return self.limit
+        return max(0, self.limit - self.used)
+
+    def spend(self) -> None:
+        """Take one login from today's budget.
+
+        Raises:
+            BudgetExhausted: When every login for today has been used
+
+        """
+        today = dt_util.now().date()
+        if self.day != today:
+            self.day, self.used = today, 0
+        if self.used >= self.limit:
+            raise BudgetExhausted(
+                f"All {self.limit} logins for today have been used, trying again tomorrow"
+            )
+        self.used += 1
+
+    def refund(self) -> None:
+        """Give back a login that was not made."""
+        self.used = max(0, self.used - 1)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the budget for diagnostics.
+
+        Returns:
+            dict[str, Any]: The daily limit and the logins left today
+
+        """
+        return {"limit": self.limit, "remaining": self.remaining}
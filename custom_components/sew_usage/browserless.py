@@ -0,0 +1,288 @@
+"""Browserless client shared by every config entry using the same endpoint."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Any
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .breaker import CircuitBreaker
+from .const import (
+    BROWSERLESS_CLIENTS,
+    BROWSERLESS_MAX_CONCURRENT,
+    DOMAIN,
+    FETCH_TIMEOUT,
+    METRIC_BYTES_RECEIVED,
+    METRIC_QUEUE_WAIT,
+)
+from .metrics import FetchMetrics
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def get_browserless_url(browserless: str) -> str:
+    """Return a browserless base URL with a trailing slash.
+
+    Arguments:
+        browserless (str): The browserless URL as configured
+
+    Returns:
+        str: The normalised URL
+
+    """
+    if browserless[-1:] != "/":
+        browserless += "/"
+    return browserless
+
+
+@lru_cache(maxsize=4)
+def get_payload_prefix(code: str) -> str:
+    """Return the start of a function request body, up to its context.
+
+    The script is JSON encoded once and reused for every request that sends it.
+
+    Arguments:
+        code (str): The script source
+
+    Returns:
+        str: The encoded request body up to the context value
+
+    """
+    return f'{{"code":{json.dumps(code)},"context":'
+
+
+def get_browserless_client(
+    hass: HomeAssistant, browserless: str, token: str | None
+) -> BrowserlessClient:
+    """Return the shared client for a browserless endpoint, creating it on first use.
+
+    Arguments:
+        hass (HomeAssistant): The Home Assistant instance.
+        browserless (str): The browserless URL
+        token (str | None): The browserless token, or None if not needed
+
+    Returns:
+        BrowserlessClient: The client every config entry and service uses for this endpoint
+
+    """
+    clients: dict[tuple[str, str], BrowserlessClient] = hass.data.setdefault(
+        DOMAIN, {}
+    ).setdefault(BROWSERLESS_CLIENTS, {})
+    key = (get_browserless_url(browserless), token or "")
+    if key not in clients:
+        clients[key] = BrowserlessClient(async_get_clientsession(hass), *key)
+    return clients[key]
+
+
+class BrowserlessClient:
+    """Runs scripts on one browserless endpoint, a limited number at a time.
+
+    Requests beyond the limit wait in a FIFO queue, and each request has a deadline
+    covering both its wait in the queue and the script run, so a long queue cannot
+    hold a caller forever.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        browserless: str,
+        token: str = "",
+        max_concurrent: int = BROWSERLESS_MAX_CONCURRENT,
+    ) -> None:
+        """Initialise the client.
+
+        Arguments:
+            session (aiohttp.ClientSession): The HTTP session to use.
+            browserless (str): The browserless URL.
+            token (str, optional): The browserless token. Defaults to "".
+            max_concurrent (int, optional): The most scripts to run at once. Defaults to BROWSERLESS_MAX_CONCURRENT.
+
+        """
+        self._session: aiohttp.ClientSession = session
+        self.browserless: str = get_browserless_url(browserless)
+        self.token: str = token or ""
+        self.max_concurrent: int = max_concurrent
+        self._active: int = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self.requests: int = 0
+        self.timeouts: int = 0
+        self.max_queue_depth: int = 0
+        self.last_wait: int = 0
+        self.breaker: CircuitBreaker = CircuitBreaker(
+            f"Browserless at {self.browserless}"
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        """Return how many requests are waiting for a free slot.
+
+        Returns:
+            int: The number of queued requests
+
+        """
+        return len(self._waiters)
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Return the queue metrics for diagnostics.
+
+        Returns:
+            dict[str, Any]: The current and peak queue depth, and request counts
+
+        """
+        return {
+            "max_concurrent": self.max_concurrent,
+            "active": self._active,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "requests": self.requests,
+            "timeouts": self.timeouts,
+            "last_wait_ms": self.last_wait,
+            "breaker": self.breaker.as_dict(),
+        }
+
+    def get_url(self, endpoint: str) -> str:
+        """Return a browserless endpoint URL including the token if one is set.
+
+        Arguments:
+            endpoint (str): The browserless endpoint, e.g. function
+
+        Returns:
+            str: The endpoint URL
+
+        """
+        if self.token == "":
+            return f"{self.browserless}{endpoint}"
+        return f"{self.browserless}{endpoint}?token={self.token}"
+
+    async def _async_acquire(self) -> None:
+        """Wait for a free slot, behind every request already queued."""
+        if self._active < self.max_concurrent and not self._waiters:
+            self._active += 1
+            return
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            await waiter
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over just as the wait was abandoned
+                self._release()
+            else:
+                # _release may already have dropped the abandoned waiter
+                with contextlib.suppress(ValueError):
+                    self._waiters.remove(waiter)
+            raise
+
+    def _release(self) -> None:
+        """Hand the slot to the next queued request, or free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    async def async_function(
+        self,
+        code: str,
+        context: dict[str, Any],
+        deadline: float = FETCH_TIMEOUT,
+        metrics: FetchMetrics | None = None,
+    ) -> dict[str, Any]:
+        """Run a puppeteer script on the browserless function endpoint.
+
+        Arguments:
+            code (str): The script source
+            context (dict[str, Any]): The context passed to the script
+            deadline (float, optional): Seconds allowed for queueing and running. Defaults to FETCH_TIMEOUT.
+            metrics (FetchMetrics, optional): Where to record the queue wait and response size. Defaults to None.
+
+        Raises:
+            CircuitOpen: When browserless has failed repeatedly and is backing off
+            aiohttp.ClientError: When browserless cannot be reached or returns an error status
+            TimeoutError: When the request does not complete before its deadline
+
+        Returns:
+            dict[str, Any]: The decoded script result
+
+        """
+        self.breaker.check()
+        try:
+            data = await self._async_function(code, context, deadline, metrics)
+        except (aiohttp.ClientError, TimeoutError, ValueError) as ex:
+            self.breaker.record_failure(ex)
+            raise
+        self.breaker.record_success()
+        return data
+
+    async def _async_function(
+        self,
+        code: str,
+        context: dict[str, Any],
+        deadline: float,
+        metrics: FetchMetrics | None,
+    ) -> dict[str, Any]:
+        """Queue for a slot and run a script, within the deadline.
+
+        Arguments:
+            code (str): The script source
+            context (dict[str, Any]): The context passed to the script
+            deadline (float): Seconds allowed for queueing and running
+            metrics (FetchMetrics | None): Where to record the queue wait and response size
+
+        Returns:
+            dict[str, Any]: The decoded script result
+
+        """
+        self.requests += 1
+        queued = time.monotonic()
+        try:
+            async with asyncio.timeout(deadline):
+                await self._async_acquire()
+                self.last_wait = round((time.monotonic() - queued) * 1000)
+                if self.last_wait:
+                    _LOGGER.debug("Browserless request waited %d ms", self.last_wait)
+                if metrics is not None:
+                    metrics.record(METRIC_QUEUE_WAIT, self.last_wait)
+                try:
+                    async with self._session.post(
+                        self.get_url("function"),
+                        data=get_payload_prefix(code) + json.dumps(context) + "}",
+                        headers={"Content-Type": "application/json"},
+                    ) as response:
+                        response.raise_for_status()
+                        body = await response.read()
+                    if metrics is not None:
+                        metrics.record(METRIC_BYTES_RECEIVED, len(body))
+                    return json.loads(body)
+                finally:
+                    self._release()
+        except TimeoutError:
+            self.timeouts += 1
+            raise
+
+    async def async_active(self, deadline: float = FETCH_TIMEOUT) -> bool:
+        """Return whether browserless is running.
+
+        Arguments:
+            deadline (float, optional): Seconds to wait for a reply. Defaults to FETCH_TIMEOUT.
+
+        Returns:
+            bool: True if browserless answered the active check
+
+        """
+        async with self._session.get(
+            self.get_url("active"), timeout=aiohttp.ClientTimeout(total=deadline)
+        ) as response:
+            return response.status == 204
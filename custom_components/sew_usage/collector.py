@@ -1,13 +1,38 @@
 """SEW API data collector that downloads the observation data."""
 
+import asyncio
 import datetime
-from datetime import datetime as dt
 import logging
+import time
 import traceback
+from collections.abc import Coroutine
+from datetime import datetime as dt
+from pathlib import Path
+from typing import Any
 
 import aiohttp
 
-from homeassistant.util import Throttle
+from .aura import AuraClient, AuraError, LoginFailed, SessionExpired
+from .breaker import CircuitBreaker, CircuitOpen, RetryBudget
+from .browserless import BrowserlessClient
+from .const import (
+    DATE_FROM,
+    DATE_TO,
+    LOGIN_PROBE_TIMEOUT,
+    METRIC_AURA_LATENCY,
+    METRIC_FAILURES,
+    METRIC_LOGIN_TIME,
+    METRIC_READINGS_PARSED,
+    METRIC_RETRIES,
+    SCRIPT_FILE,
+    SEW_PASSWORD,
+    SEW_URL,
+    SEW_USERNAME,
+    USAGE_MAINS,
+    USAGE_RECYCLED,
+)
+from .metrics import FetchMetrics
+from .session import SessionStore, SEWSession
 
 # from .const import (
 #     ATTR_CONFIDENCE,
@@ -62,10 +87,21 @@ class Collector:
         token: str,
         recycled_water_serial: str = "",
         install_date: dt.date = dt.today,
+        session: aiohttp.ClientSession | None = None,
+        session_store: SessionStore | None = None,
+        billing_account_id: str = "",
+        sew_url: str = SEW_URL,
+        browserless_client: BrowserlessClient | None = None,
+        portal_breaker: CircuitBreaker | None = None,
+        retry_budget: RetryBudget | None = None,
     ) -> None:
         """Init collector."""
         self.location_data: dict = {}
         self.observation_data: dict = {}
+        self.timings: dict[str, Any] = {}
+        self.metrics: FetchMetrics = FetchMetrics()
+        self._in_flight: dict[tuple, asyncio.Task] = {}
+        self._setup_task: asyncio.Task | None = None
         self.mains_water_serial: str = mains_water_serial
         self.sew_username: str = sew_username
         self.sew_password: str = sew_password
@@ -75,10 +111,69 @@ class Collector:
         self.install_date: dt.date = install_date
         self.last_updated: dt = dt.fromtimestamp(0)
         self.site_found: bool = False
+        self.until: str | int = 0
+        self._session: aiohttp.ClientSession | None = session
+        self._script: str | None = None
+        self._session_store: SessionStore | None = session_store
+        self._aura: AuraClient | None = None
+        self.billing_account_id: str = billing_account_id or ""
+        self.sew_url: str = sew_url
+        self._browserless_client: BrowserlessClient | None = browserless_client
+        self.portal_breaker: CircuitBreaker = portal_breaker or CircuitBreaker(sew_url)
+        self.retry_budget: RetryBudget = retry_budget or RetryBudget()
 
         if self.browserless[-1:] != "/":
             self.browserless += "/"
 
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared Home Assistant session, or a private one when none was given.
+
+        Returns:
+            aiohttp.ClientSession: The session used for browserless requests
+
+        """
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    def _get_browserless(self) -> BrowserlessClient:
+        """Return the browserless client, creating a private one when none was shared.
+
+        Returns:
+            BrowserlessClient: The client used for browserless requests
+
+        """
+        if self._browserless_client is None:
+            self._browserless_client = BrowserlessClient(
+                self._get_session(), self.browserless, self.token
+            )
+        return self._browserless_client
+
+    def _get_aura(self) -> AuraClient:
+        """Return the direct HTTP client for the SEW portal.
+
+        Returns:
+            AuraClient: The aura client
+
+        """
+        if self._aura is None:
+            self._aura = AuraClient(self._get_session(), self.sew_url, self.metrics)
+        return self._aura
+
+    async def _get_script(self) -> str:
+        """Return the scraper script sent to browserless, loading it once off the event loop.
+
+        Returns:
+            str: The puppeteer script source
+
+        """
+        if self._script is None:
+            path = Path(__file__).parent / SCRIPT_FILE
+            self._script = await asyncio.get_running_loop().run_in_executor(
+                None, path.read_text
+            )
+        return self._script
+
     async def valid_browserless(self) -> bool:
         """Return true if a valid browserless has been found and logged into.
 
@@ -88,6 +183,16 @@ class Collector:
         """
         return self.site_found
 
+    @property
+    def has_data(self) -> bool:
+        """Return whether any sensor value is known, restored or fetched.
+
+        Returns:
+            bool: True once a value has been restored from storage or fetched from SEW
+
+        """
+        return bool(self.observation_data)
+
     def get_browserless(self) -> str:
         """Return the browserless URL.
 
@@ -99,6 +204,24 @@ class Collector:
             return self.browserless
         return ""
 
+    def get_browserless_metrics(self) -> dict[str, Any]:
+        """Return the queue metrics of the browserless client.
+
+        Returns:
+            dict[str, Any]: The browserless queue metrics
+
+        """
+        return self._get_browserless().get_metrics()
+
+    def get_breakers(self) -> list[CircuitBreaker]:
+        """Return the breakers guarding the SEW portal and browserless.
+
+        Returns:
+            list[CircuitBreaker]: The portal breaker, then the browserless breaker
+
+        """
+        return [self.portal_breaker, self._get_browserless().breaker]
+
     def get_mains_water_serial(self) -> str:
         """Return the Mains Water Meter Serial Number.
 
@@ -119,6 +242,20 @@ class Collector:
             return None
         return self.recycled_water_serial
 
+    def get_install_date(self) -> datetime.date | None:
+        """Return the date the digital meter was installed.
+
+        Returns:
+            datetime.date | None: The install date, or None if it is not set
+
+        """
+        if isinstance(self.install_date, datetime.date):
+            return self.install_date
+        try:
+            return datetime.date.fromisoformat(str(self.install_date)[:10])
+        except ValueError:
+            return None
+
     def get_sew_username(self) -> str:
         """Return the SEW Username.
 
@@ -144,52 +281,360 @@ class Collector:
             str: SEW Site Reading Validity Time
 
         """
-        if self.site_found:
+        if self.has_data:
             return self.until
         return 0
 
     def get_sensor(self, key: str):
         """Return A sensor.
 
+        Values restored from storage are returned before browserless has been checked.
+
         Returns:
-            Any: SEW Site Sensor
+            Any: SEW Site Sensor, or None before it has a value
 
         """
-        if self.site_found:
-            try:
-                return self.observation_data.get(key)
-            except KeyError:
-                return "Sensor %s Not Found!"
-        return None
-
-    @Throttle(datetime.timedelta(minutes=5))
-    async def async_update(self):
-        """Refresh the data on the collector object."""
-        try:
-            if self.site_found:
-                self.observation_data = {}
+        return self.observation_data.get(key)
 
-        except ConnectionRefusedError as e:
-            _LOGGER.error("Connection error in async_update, connection refused: %s", e)
-        except Exception:  # noqa: BLE001
+    async def async_get_usage(
+        self, date_from: datetime.date, date_to: datetime.date
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Fetch hourly usage for a range of dates.
+
+        A saved SEW session is used to call the aura endpoint directly. When the portal
+        rejects it, the collector logs in over plain HTTP if the billing account id is
+        known, and otherwise, or if that fails, logs in once in a browserless session.
+
+        Callers asking for the same meters and dates while a fetch is running share
+        that fetch and its result, rather than starting another.
+
+        Arguments:
+            date_from (datetime.date): The first date to fetch
+            date_to (datetime.date): The last date to fetch
+
+        Raises:
+            aiohttp.ClientError: When browserless cannot be reached or returns an error status
+            TimeoutError: When the fetch does not complete within FETCH_TIMEOUT seconds, including time queued behind other fetches
+
+        Returns:
+            dict[str, list[dict[str, Any]]]: Days of usage, keyed by mains and recycled
+
+        """
+        key = (self.mains_water_serial, self.recycled_water_serial, date_from, date_to)
+        if (task := self._in_flight.get(key)) is None:
+            task = asyncio.get_running_loop().create_task(
+                self._async_get_usage_once(date_from, date_to)
+            )
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
             _LOGGER.debug(
-                "Exception in async_update(): %s",
-                traceback.format_exc(),
+                "Joining the fetch in flight for %s to %s", date_from, date_to
+            )
+
+        # shielded, so one caller giving up does not cancel the fetch for the others
+        return await asyncio.shield(task)
+
+    async def _async_get_usage_once(
+        self, date_from: datetime.date, date_to: datetime.date
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Fetch hourly usage for a range of dates, counting failures and readings.
+
+        Arguments:
+            date_from (datetime.date): The first date to fetch
+            date_to (datetime.date): The last date to fetch
+
+        Returns:
+            dict[str, list[dict[str, Any]]]: Days of usage, keyed by mains and recycled
+
+        """
+        try:
+            usage = await self._async_fetch_usage(date_from, date_to)
+        except Exception:
+            self.metrics.increment(METRIC_FAILURES)
+            raise
+
+        self.metrics.record(
+            METRIC_READINGS_PARSED,
+            sum(len(day["readings"]) for days in usage.values() for day in days),
+        )
+        return usage
+
+    async def _async_fetch_usage(
+        self, date_from: datetime.date, date_to: datetime.date
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Fetch hourly usage, falling back from the saved session to a new login.
+
+        Every login is taken from the account's daily budget, and the portal and
+        browserless are each called through their circuit breaker.
+
+        Arguments:
+            date_from (datetime.date): The first date to fetch
+            date_to (datetime.date): The last date to fetch
+
+        A rejected username or password is raised straight away rather than retried
+        through browserless, and never counts against a breaker, so one account's
+        wrong password cannot pause fetches for every other account.
+
+        Raises:
+            BudgetExhausted: When a login is needed and today's budget is used up
+            CircuitOpen: When browserless has failed repeatedly and is backing off
+            LoginFailed: When SEW rejected the username or password
+
+        Returns:
+            dict[str, list[dict[str, Any]]]: Days of usage, keyed by mains and recycled
+
+        """
+        if self._session_store is not None:
+            sew_session = await self._session_store.async_get()
+            if sew_session is not None:
+                try:
+                    return await self._async_call_portal(
+                        self._async_get_usage_direct(sew_session, date_from, date_to)
+                    )
+                except SessionExpired:
+                    _LOGGER.debug("Saved SEW session rejected, logging in again")
+                    self.metrics.increment(METRIC_RETRIES)
+                    await self._session_store.async_invalidate()
+                except CircuitOpen as ex:
+                    _LOGGER.debug("Skipping the saved SEW session: %s", ex)
+
+        if self.billing_account_id != "":
+            try:
+                self.retry_budget.spend()
+                started = time.monotonic()
+                sew_session = await self._async_call_portal(
+                    self._get_aura().async_login(
+                        self.sew_username,
+                        self.sew_password,
+                        self.billing_account_id,
+                        self.mains_water_serial,
+                    )
+                )
+                self.metrics.record(
+                    METRIC_LOGIN_TIME, round((time.monotonic() - started) * 1000)
+                )
+                if self._session_store is not None:
+                    await self._session_store.async_save(sew_session)
+                return await self._async_call_portal(
+                    self._async_get_usage_direct(sew_session, date_from, date_to)
+                )
+            except CircuitOpen as ex:
+                _LOGGER.debug("Direct SEW login skipped, using browserless: %s", ex)
+                self.retry_budget.refund()
+            except LoginFailed:
+                raise
+            except (AuraError, aiohttp.ClientError, TimeoutError) as ex:
+                _LOGGER.debug("Direct SEW login failed, using browserless: %s", ex)
+                self.metrics.increment(METRIC_RETRIES)
+
+        context = {
+            SEW_USERNAME: self.sew_username,
+            SEW_PASSWORD: self.sew_password,
+            DATE_FROM: date_from.isoformat(),
+            DATE_TO: date_to.isoformat(),
+            "recycled_water_serial": self.recycled_water_serial,
+            "default_meterId": self.mains_water_serial,
+            "default_baId": self.billing_account_id,
+            "return_session": self._session_store is not None,
+        }
+        self.retry_budget.spend()
+        try:
+            data = await self._get_browserless().async_function(
+                await self._get_script(), context, metrics=self.metrics
             )
+        except CircuitOpen:
+            self.retry_budget.refund()
+            raise
+        if data.get("login") is False:
+            raise LoginFailed("SEW did not accept the username or password")
+
+        self.timings = data.pop("timings", {})
+        _LOGGER.debug("SEW fetch timings (ms): %s", self.timings)
+        if "login" in self.timings:
+            self.metrics.record(METRIC_LOGIN_TIME, self.timings["login"])
+        for latency in self.timings.get("aura", []):
+            self.metrics.record(METRIC_AURA_LATENCY, latency)
+
+        session_data = data.pop("session", None)
+        if session_data and self._session_store is not None:
+            await self._session_store.async_save(SEWSession.from_scraper(session_data))
+
+        return parse_usage(data)
+
+    async def _async_call_portal[T](self, call: Coroutine[Any, Any, T]) -> T:
+        """Make a request to the SEW portal through its circuit breaker.
+
+        A rejected saved session or login still shows the portal is answering, so it
+        counts as a success. Wrong credentials are held back by the account's daily
+        login budget instead, so they cannot pause fetches for other accounts.
+
+        Arguments:
+            call (Coroutine[Any, Any, T]): The portal request
+
+        Raises:
+            CircuitOpen: When the portal has failed repeatedly and is backing off
+
+        Returns:
+            T: The result of the request
+
+        """
+        try:
+            self.portal_breaker.check()
+        except CircuitOpen:
+            call.close()
+            raise
+        try:
+            result = await call
+        except (SessionExpired, LoginFailed):
+            self.portal_breaker.record_success()
+            raise
+        except (AuraError, aiohttp.ClientError, TimeoutError) as ex:
+            self.portal_breaker.record_failure(ex)
+            raise
+        self.portal_breaker.record_success()
+        return result
+
+    async def _async_get_usage_direct(
+        self,
+        sew_session: SEWSession,
+        date_from: datetime.date,
+        date_to: datetime.date,
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Fetch hourly usage straight from the aura endpoint using a logged in session.
+
+        Arguments:
+            sew_session (SEWSession): The logged in SEW session
+            date_from (datetime.date): The first date to fetch
+            date_to (datetime.date): The last date to fetch
+
+        Raises:
+            SessionExpired: When the portal rejects the saved session
+
+        Returns:
+            dict[str, list[dict[str, Any]]]: Days of usage, keyed by mains and recycled
+
+        """
+        meters = {USAGE_MAINS: self.mains_water_serial}
+        if self.get_recycled_water_serial() is not None:
+            meters[USAGE_RECYCLED] = self.recycled_water_serial
+
+        aura = self._get_aura()
+        usage = await aura.async_get_usage(sew_session, meters, date_from, date_to)
+
+        self.timings = {"aura": aura.timings}
+        _LOGGER.debug("SEW fetch timings (ms): %s", self.timings)
+        return parse_usage(usage)
+
+    async def async_check_login(self) -> None:
+        """Log in to SEW once to check the credentials, without fetching any usage.
+
+        The direct login is used when a billing account id is set, and a login-only
+        browserless run otherwise. Either way the check gives up after
+        LOGIN_PROBE_TIMEOUT seconds, so a config flow form is never held for long.
+
+        The login is taken from the account's daily budget and goes through the same
+        circuit breakers as a fetch, so repeated form submits cannot lock the account.
+
+        Raises:
+            BudgetExhausted: When today's logins for the account are used up
+            CircuitOpen: When the portal or browserless is failing and backing off
+            LoginFailed: When SEW rejected the username or password
+            AuraError: When the direct login could not complete
+            aiohttp.ClientError: When SEW or browserless cannot be reached
+            TimeoutError: When the login does not complete within LOGIN_PROBE_TIMEOUT seconds
+
+        """
+        self.retry_budget.spend()
+        started = time.monotonic()
+        try:
+            await self._async_check_login_once()
+        except CircuitOpen:
+            self.retry_budget.refund()
+            raise
+        self.metrics.record(
+            METRIC_LOGIN_TIME, round((time.monotonic() - started) * 1000)
+        )
+
+    async def _async_check_login_once(self) -> None:
+        """Log in to SEW once, within LOGIN_PROBE_TIMEOUT seconds.
+
+        Raises:
+            CircuitOpen: When the portal or browserless is failing and backing off
+            LoginFailed: When SEW rejected the username or password
+
+        """
+        async with asyncio.timeout(LOGIN_PROBE_TIMEOUT):
+            if self.billing_account_id != "":
+                await self._async_call_portal(
+                    self._get_aura().async_login(
+                        self.sew_username,
+                        self.sew_password,
+                        self.billing_account_id,
+                        self.mains_water_serial,
+                    )
+                )
+            else:
+                context = {
+                    SEW_USERNAME: self.sew_username,
+                    SEW_PASSWORD: self.sew_password,
+                    "default_meterId": self.mains_water_serial,
+                    "login_only": True,
+                    # the scraper reports a rejected login before the probe times out
+                    "login_timeout": LOGIN_PROBE_TIMEOUT * 1000 // 2,
+                }
+                data = await self._get_browserless().async_function(
+                    await self._get_script(),
+                    context,
+                    deadline=LOGIN_PROBE_TIMEOUT,
+                    metrics=self.metrics,
+                )
+                if not data.get("login"):
+                    raise LoginFailed("SEW did not accept the username or password")
 
     async def async_setup(self):
-        """Check that browserless is running for the collector object."""
+        """Check that browserless is running for the collector object.
+
+        Overlapping calls share one check.
+        """
+        if self._setup_task is None or self._setup_task.done():
+            self._setup_task = asyncio.get_running_loop().create_task(
+                self._async_setup_once()
+            )
+        await asyncio.shield(self._setup_task)
+
+    async def _async_setup_once(self):
+        """Check once that browserless is running."""
         try:
             if not self.site_found:
-                async with aiohttp.ClientSession() as session:
-                    url = f"{self.browserless}active?token={self.token}"
-                    response = await session.get(url)
-                    if response is not None and response.status == 204:
-                        self.site_found = True
+                self.site_found = await self._get_browserless().async_active()
         except ConnectionRefusedError as e:
             _LOGGER.error("Connection error in async_setup, connection refused: %s", e)
         except Exception:  # noqa: BLE001
-            _LOGGER.debug(
-                "Exception in async_setup(): %s",
+            _LOGGER.warning(
+                "Unable to confirm browserless is running: %s",
                 traceback.format_exc(),
             )
+
+
+def parse_usage(data: dict[str, Any]) -> dict[str, list[dict[str, Any]]]:
+    """Normalise a scraper response into lists of days per meter.
+
+    The scraper returns a list of days per meter in range mode and a single day otherwise.
+
+    Arguments:
+        data (dict[str, Any]): The decoded browserless response
+
+    Returns:
+        dict[str, list[dict[str, Any]]]: Days of usage, keyed by mains and recycled
+
+    """
+    usage: dict[str, list[dict[str, Any]]] = {}
+    for meter in (USAGE_MAINS, USAGE_RECYCLED):
+        days = data.get(meter)
+        if days is None:
+            continue
+        if isinstance(days, dict):
+            days = [days]
+        usage[meter] = [day for day in days if day and day.get("readings") is not None]
+    return usage
@@ -2,12 +2,11 @@
 
 from __future__ import annotations
 
-from datetime import date
 import logging
+from datetime import date
 from typing import Any
 
 import voluptuous as vol
-
 from homeassistant import config_entries
 from homeassistant.config_entries import ConfigEntry, ConfigFlow, OptionsFlow
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
@@ -15,8 +14,8 @@ from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.selector import selector
 
-from .collector import Collector
 from .const import (
+    BILLING_ACCOUNT_ID,
     BROWSERLESS,
     DOMAIN,
     INSTALL_DATE,
@@ -25,7 +24,7 @@ from .const import (
     TITLE,
     TOKEN,
 )
-from .coordinator import SEWDataUpdateCoordinator
+from .validation import async_validate
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -37,7 +36,6 @@ class SEWConfigFlowHandler(ConfigFlow, domain=DOMAIN):
     def __init__(self) -> None:
         """Initialise the config flow."""
         self.data = {}
-        self.collector: Collector = None
 
     VERSION = 1
     CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_POLL
@@ -74,55 +72,27 @@ class SEWConfigFlowHandler(ConfigFlow, domain=DOMAIN):
         errors = {}
 
         if user_input is not None:
-            try:
-                device = SEWDataUpdateCoordinator(
-                    hass=self.hass,
-                    collector=Collector,
-                )
-                await device.async_init()
-
-                # Create the collector object with the given parameters
-                self.collector = Collector(
-                    mains_water_serial=user_input[MAINS_WATER_SERIAL],
-                    sew_username=user_input[CONF_USERNAME],
-                    sew_password=user_input[CONF_PASSWORD],
-                    browserless=user_input[BROWSERLESS],
-                    token=user_input[TOKEN],
-                    recycled_water_serial=user_input[RECYCLED_WATER_SERIAL],
-                    install_date=user_input[INSTALL_DATE],
-                )
-
-                # Save the user input into self.data so it's retained
-                self.data = user_input
-
-                # Check if location is valid
-                await self.collector.async_setup()
-                if not self.collector.valid_browserless():
-                    _LOGGER.debug("Unable to retrieve location list from EPA")
-                    errors["base"] = "bad_api"
-
-                options = {
-                    MAINS_WATER_SERIAL: user_input[MAINS_WATER_SERIAL],
-                    CONF_USERNAME: user_input[CONF_USERNAME],
-                    CONF_PASSWORD: user_input[CONF_PASSWORD],
-                    BROWSERLESS: user_input[BROWSERLESS],
-                    TOKEN: user_input[TOKEN],
-                    INSTALL_DATE: user_input[INSTALL_DATE],
-                    RECYCLED_WATER_SERIAL: user_input[RECYCLED_WATER_SERIAL],
-                }
-
-            except TimeoutError:
-                return self.async_abort(reason="API timeout")
-
-            except Exception:
-                _LOGGER.exception("Unexpected exception")
-                errors["base"] = "unknown"
+            options = {
+                MAINS_WATER_SERIAL: user_input[MAINS_WATER_SERIAL],
+                CONF_USERNAME: user_input[CONF_USERNAME],
+                CONF_PASSWORD: user_input[CONF_PASSWORD],
+                BROWSERLESS: user_input[BROWSERLESS],
+                TOKEN: user_input[TOKEN],
+                INSTALL_DATE: user_input[INSTALL_DATE],
+                RECYCLED_WATER_SERIAL: user_input[RECYCLED_WATER_SERIAL],
+                BILLING_ACCOUNT_ID: user_input.get(BILLING_ACCOUNT_ID, ""),
+            }
+
+            # Save the user input into self.data so it's retained
+            self.data = user_input
 
-            return self.async_create_entry(
-                title=TITLE,
-                data={},
-                options=options,
-            )
+            errors = await async_validate(self.hass, options)
+            if not errors:
+                return self.async_create_entry(
+                    title=TITLE,
+                    data={},
+                    options=options,
+                )
 
         return self.async_show_form(
             step_id="user",
@@ -137,6 +107,7 @@ class SEWConfigFlowHandler(ConfigFlow, domain=DOMAIN):
                         {"text": {"type": "date"}}
                     ),
                     vol.Optional(RECYCLED_WATER_SERIAL, default=""): str,
+                    vol.Optional(BILLING_ACCOUNT_ID, default=""): str,
                 }
             ),
             errors=errors,
@@ -166,24 +137,6 @@ class SEWOptionFlowHandler(OptionsFlow):
         """
 
         errors = {}
-        mains_water_serial = self._options.get(MAINS_WATER_SERIAL)
-        recycled_water_serial = self._options.get(RECYCLED_WATER_SERIAL)
-        sew_username = self._options.get(CONF_USERNAME)
-        sew_password = self._options.get(CONF_PASSWORD)
-        browserless = self._options.get(BROWSERLESS)
-        token = self._options.get(TOKEN)
-        install_date = self._options.get(INSTALL_DATE)
-        collector: Collector = Collector(
-            mains_water_serial=mains_water_serial,
-            sew_username=sew_username,
-            sew_password=sew_password,
-            browserless=browserless,
-            token=token,
-        )
-        await collector.async_setup()
-        if not collector.site_found:
-            _LOGGER.debug("Unable to retrieve location list from SEW")
-            errors["base"] = "bad_api"
 
         if user_input is not None:
             all_config_data = {**self._options}
@@ -209,19 +162,23 @@ class SEWOptionFlowHandler(OptionsFlow):
             install_date = user_input[INSTALL_DATE]
             all_config_data[INSTALL_DATE] = install_date
 
+            billing_account_id = user_input.get(BILLING_ACCOUNT_ID, "").replace(" ", "")
+            all_config_data[BILLING_ACCOUNT_ID] = billing_account_id
+
             token = user_input[TOKEN]
             all_config_data[TOKEN] = token
 
             self.data = user_input
 
-            self.hass.config_entries.async_update_entry(
-                self._entry,
-                title=TITLE,
-                options=all_config_data,
-            )
-            await collector.async_update()
+            errors = await async_validate(self.hass, all_config_data)
+            if not errors:
+                self.hass.config_entries.async_update_entry(
+                    self._entry,
+                    title=TITLE,
+                    options=all_config_data,
+                )
 
-            return self.async_create_entry(title=TITLE, data=None)
+                return self.async_create_entry(title=TITLE, data=None)
 
         return self.async_show_form(
             step_id="init",
@@ -254,6 +211,10 @@ class SEWOptionFlowHandler(OptionsFlow):
                         RECYCLED_WATER_SERIAL,
                         default=self._options.get(RECYCLED_WATER_SERIAL, vol.UNDEFINED),
                     ): str,
+                    vol.Optional(
+                        BILLING_ACCOUNT_ID,
+                        default=self._options.get(BILLING_ACCOUNT_ID, ""),
+                    ): str,
                 }
             ),
             errors=errors,
@@ -9,6 +9,7 @@ ATTR_ENTRY_TYPE: Final = "entry_type"
 ATTRIBUTION: Final = "Data retrieved from South East Water"
 COLLECTOR: Final = "collector"
 DOMAIN: Final = "sew_usage"
+UNIQUE_ID_PREFIX: Final = "SEW_SEW_api_"
 ENTRY_TYPE_SERVICE: Final = "service"
 COORDINATOR: Final = "coordinator"
 UPDATE_LISTENER: Final = "update_listener"
@@ -28,7 +29,6 @@ SENSOR_MAINS = "water_usage_mains"
 SENSOR_MAINS_UNIQUEID = "current_water_mains_usage"
 SENSOR_RECYCLED = "water_usage_recycled"
 SENSOR_RECYCLED_UNIQUEID = "current_water_recycled_usage"
-SCAN_INTERVAL = 24
 MAINS_WATER_SERIAL = "mains_water_serial"
 RECYCLED_WATER_SERIAL = "recycled_water_serial"
 SEW_USERNAME = "sew_username"
@@ -36,3 +36,75 @@ SEW_PASSWORD = "sew_password"
 BROWSERLESS = "browserless"
 TOKEN = "token"
 INSTALL_DATE = "install_date"
+BILLING_ACCOUNT_ID = "billing_account_id"
+DATE_FROM = "date_from"
+DATE_TO = "date_to"
+STAT_ID = "stat_id"
+SERVICE_IMPORT_WATER_USAGE = "import_water_usage"
+SCRIPT_FILE = "get_water_usage.js"
+FETCH_TIMEOUT = 180
+STARTUP_BUDGET = 60
+VALIDATION_TIMEOUT = 10
+LOGIN_PROBE_TIMEOUT = 15
+VALIDATION_TTL = 300
+VALIDATIONS = "validations"
+BREAKER_THRESHOLD = 3
+BREAKER_BASE_DELAY = 900
+BREAKER_MAX_DELAY = 21600
+BREAKER_JITTER = 0.2
+BREAKERS = "breakers"
+RETRY_BUDGETS = "retry_budgets"
+DAILY_LOGIN_BUDGET = 12
+ISSUE_CIRCUIT_OPEN = "circuit_open"
+SETUP_TIME = "setup_ms"
+FIRST_REFRESH_TIME = "first_refresh_ms"
+FIRST_REFRESH = "first_refresh"
+BROWSERLESS_MAX_CONCURRENT = 2
+BROWSERLESS_CLIENTS = "browserless_clients"
+USAGE_MAINS = "mains"
+USAGE_RECYCLED = "recycled"
+PUBLISH_WINDOW_START = 9
+RETRY_INTERVAL = 15
+LATE_POLL_INTERVAL = 180
+ARRIVAL_HISTORY = 30
+ARRIVAL_MARGIN = 5
+ARRIVAL_PROBE = 30
+ARRIVALS = "arrivals"
+REVISION_RECHECK_DAYS = 3
+STORAGE_VERSION = 1
+LAST_DATE = "last_date"
+TOTALS = "totals"
+TOTAL = "total"
+LAST_HOUR = "last_hour"
+SEW_URL = "https://my.southeastwater.com.au"
+AURA_PAGE_URI = "/s/usage"
+AURA_FWUID = "REdtNUF5ejJUNWxpdVllUjQtUzV4UTFLcUUxeUY3ZVB6dE9hR0VheDVpb2cxMy4zMzU1NDQzMi41MDMzMTY0OA"
+AURA_APP_LOADED = "1422_wotCJi-4iLy4EgTPC6RQ4g"
+MAX_RANGE_DAYS = 31
+SESSION_LIFETIME = 110
+BACKFILL_MERGE_GAP = 3
+SENSOR_BACKFILL = "backfill_progress"
+SERVICE_BACKFILL = "backfill"
+METRICS_WINDOW = 100
+METRIC_QUEUE_WAIT = "browserless_queue_wait"
+METRIC_LOGIN_TIME = "login_time"
+METRIC_AURA_LATENCY = "aura_latency"
+METRIC_BYTES_RECEIVED = "bytes_received"
+METRIC_READINGS_PARSED = "readings_parsed"
+METRIC_RECORDER_WRITE = "recorder_write_time"
+METRIC_RETRIES = "fetch_retries"
+METRIC_FAILURES = "fetch_failures"
+AGGREGATE_DAYS = 30
+AGGREGATE_SHORT_DAYS = 7
+SENSOR_DAILY_USAGE = "daily_usage"
+SENSOR_AVERAGE_WEEK = "average_daily_usage_week"
+SENSOR_AVERAGE_MONTH = "average_daily_usage_month"
+SENSOR_PEAK_HOUR = "peak_hour_usage"
+SENSOR_HOUR_PROFILE = "hourly_usage_profile"
+SENSOR_LEAK = "leak_detected"
+EVENT_LEAK_DETECTED = "sew_usage_leak_detected"
+LEAK_NIGHT_END = 5
+LEAK_BASELINE_NIGHTS = 30
+LEAK_CONTINUOUS_HOURS = 24
+LEAK_MIN_NIGHT_FLOW = 2.0
+LEAK_BASELINE_FACTOR = 2.0
@@ -1,188 +1,728 @@
-"""Support for South East Water Usage, initialisation."""
+"""The South East Water Usage coordinator."""
 
-import logging
+from __future__ import annotations
 
-from aiohttp.client_exceptions import ClientConnectorError
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from datetime import datetime as dt
+from typing import Any
 
-from homeassistant import loader
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers import device_registry as dr
-from homeassistant.loader import async_get_loaded_integration
-
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import issue_registry as ir
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.loader import async_get_integration
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+
+from .aggregates import UsageAggregates
+from .backfill import (
+    BACKFILL_COMPLETE,
+    BACKFILL_FAILED,
+    BACKFILL_RUNNING,
+    BackfillProgress,
+    count_missing_in,
+    dates_between,
+    plan_backfill,
+)
+from .breaker import BREAKER_OPEN
 from .collector import Collector
 from .const import (
-    BROWSERLESS,
+    AGGREGATE_DAYS,
+    ARRIVAL_HISTORY,
+    ARRIVAL_MARGIN,
+    ARRIVAL_PROBE,
+    ARRIVALS,
     DOMAIN,
-    INSTALL_DATE,
-    MAINS_WATER_SERIAL,
-    RECYCLED_WATER_SERIAL,
-    TOKEN,
+    EVENT_LEAK_DETECTED,
+    FIRST_REFRESH,
+    FIRST_REFRESH_TIME,
+    ISSUE_CIRCUIT_OPEN,
+    LAST_DATE,
+    LAST_HOUR,
+    LATE_POLL_INTERVAL,
+    METRIC_RECORDER_WRITE,
+    PUBLISH_WINDOW_START,
+    RETRY_INTERVAL,
+    REVISION_RECHECK_DAYS,
+    SENSOR_BACKFILL,
+    SENSOR_MAINS,
+    SENSOR_RECYCLED,
+    STARTUP_BUDGET,
+    STORAGE_VERSION,
+    TOTAL,
+    TOTALS,
+    USAGE_MAINS,
+    USAGE_RECYCLED,
+)
+from .importer import (
+    async_get_imported_dates,
+    async_import_usage,
+    async_revise_usage,
+    get_day_date,
+    get_stat_id,
 )
-from .coordinator import SEWDataUpdateCoordinator
-from .data import SEWConfigEntry, SEWData
+from .leak import LeakDetector
+from .store import ReadingStore
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS = [Platform.SENSOR]
-
-
-async def async_migrate_entry(hass: HomeAssistant, entry: SEWConfigEntry) -> bool:
-    """Migrate old entry."""
-    _LOGGER.debug("Migrating from version %s", entry.version)
-
-    if entry.version == 0:
-        new = {**entry.data}
-        if MAINS_WATER_SERIAL in new:
-            new[MAINS_WATER_SERIAL] = entry.data[MAINS_WATER_SERIAL]
-
-        entry.version = 1
-        hass.config_entries.async_update_entry(entry, data=new)
-
-    _LOGGER.info("Migration to version %s successful", entry.version)
-    return True
+METER_SENSORS = {USAGE_MAINS: SENSOR_MAINS, USAGE_RECYCLED: SENSOR_RECYCLED}
 
 
-async def async_setup_entry(hass: HomeAssistant, entry: SEWConfigEntry) -> bool:
-    """Set up the integration.
-
-    * Get and sanitise options.
-    * Instantiate the main class.
-    * Instantiate the coordinator.
+def predict_publish_time(arrivals: list[int]) -> int:
+    """Return when SEW is expected to publish yesterday's readings.
 
     Arguments:
-        hass (HomeAssistant): The Home Assistant instance.
-        entry (ConfigEntry): The integration entry instance, contains the configuration.
-
-    Raises:
-        ConfigEntryNotReady: Instructs Home Assistant that the integration is not yet ready when a load failure occurs.
-
-    Returns:
-        bool: Whether setup has completed successfully.
-
-    """
-
-    # version = await get_version(hass)
-
-    options = entry.options
-    mains_water_serial = options.get(MAINS_WATER_SERIAL)
-    recycled_water_serial = options.get(RECYCLED_WATER_SERIAL)
-    sew_username = options.get(CONF_USERNAME)
-    sew_password = options.get(CONF_PASSWORD)
-    browserless = options.get(BROWSERLESS)
-    token = options.get(TOKEN)
-    install_date = options.get(INSTALL_DATE)
-    collector: Collector = Collector(
-        mains_water_serial=mains_water_serial,
-        sew_username=sew_username,
-        sew_password=sew_password,
-        browserless=browserless,
-        token=token,
-        recycled_water_serial=recycled_water_serial,
-        install_date=install_date,
-    )
-    coordinator: SEWDataUpdateCoordinator = SEWDataUpdateCoordinator(
-        hass=hass, collector=collector
-    )
-
-    entry.runtime_data = SEWData(
-        coordinator=coordinator,
-        integration=async_get_loaded_integration(hass, entry.domain),
-        other_data=entry,
-    )
-
-    _LOGGER.debug("Successful init")
-
-    opt = {**entry.options}
-    hass.config_entries.async_update_entry(entry, options=opt)
-
-    try:
-        await collector.async_update()
-    except ClientConnectorError as ex:
-        raise ConfigEntryNotReady from ex
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-
-    await coordinator.async_refresh()
-
-    hass.data.setdefault(DOMAIN, {})
-
-    entry.async_on_unload(entry.add_update_listener(async_update_options))
-
-    return True
-
-
-async def get_version(hass: HomeAssistant) -> str:
-    """Get trimmed version string for use in User Agent String.
-
-    Args:
-        hass (HomeAssistant): hass Reference
+        arrivals (list[int]): Recent arrival times, in minutes after local midnight
 
     Returns:
-        str: Trimmed Version String
+        int: The median arrival time, or the start of the publish window without history
 
     """
-    try:
-        version = ""
-        integration = await loader.async_get_integration(hass, DOMAIN)
-        version = str(integration.version)
-    except loader.IntegrationNotFound:
-        pass
+    if not arrivals:
+        return PUBLISH_WINDOW_START * 60
+    ordered = sorted(arrivals)
+    return ordered[len(ordered) // 2]
 
-    return version
 
+def estimate_arrival(now: dt, last_attempt: dt | None) -> int:
+    """Estimate when readings that have just landed were published.
 
-def get_ua_version(version: str) -> str:
-    """Get trimmed version string for use in User Agent String.
+    The readings arrived between the last attempt that found nothing and now. When
+    the first attempt of the day succeeds, the estimate is pulled ARRIVAL_PROBE minutes
+    earlier, so that the prediction keeps probing for an earlier publish time.
 
-    Args:
-        version (str): version string
+    Arguments:
+        now (dt): The local time the readings were found
+        last_attempt (dt | None): The local time of today's last unsuccessful attempt
 
     Returns:
-        str: Trimmed Version String
+        int: The estimated arrival time, in minutes after local midnight
 
     """
-
-    raw_version = version.replace("v", "")
-
-    return raw_version[: raw_version.rfind(".")]
+    midnight = dt_util.start_of_local_day(now)
+    earliest = last_attempt or now - timedelta(minutes=ARRIVAL_PROBE)
+    earliest = max(earliest, midnight)
+    return round(((earliest - midnight) + (now - earliest) / 2).total_seconds() / 60)
 
 
-async def async_update_options(hass: HomeAssistant, entry: ConfigEntry):
-    """Handle config entry updates."""
-    await hass.config_entries.async_reload(entry.entry_id)
+def get_next_update(
+    now: dt, landed: bool, publish_time: int, attempts: int = 0
+) -> timedelta:
+    """Return how long to wait before the next refresh.
 
-
-async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Unload a config entry.
-
-    This also removes the services available.
+    The first attempt of the day is made just after the predicted publish time. Until
+    the day has landed, retries back off from RETRY_INTERVAL, doubling each time up
+    to LATE_POLL_INTERVAL, and once it has landed nothing is fetched until tomorrow.
 
     Arguments:
-        hass (HomeAssistant): The Home Assistant instance.
-        entry (ConfigEntry): The integration entry instance, contains the configuration.
+        now (dt): The current local time
+        landed (bool): Whether yesterday's readings have been imported
+        publish_time (int): The predicted publish time, in minutes after local midnight
+        attempts (int, optional): Unsuccessful attempts made today. Defaults to 0.
 
     Returns:
-        bool: Whether the unload completed successfully.
+        timedelta: The delay until the next refresh
 
     """
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    first_attempt = dt_util.start_of_local_day(now) + timedelta(
+        minutes=publish_time + ARRIVAL_MARGIN
+    )
+    if landed:
+        if now >= first_attempt:
+            first_attempt = dt_util.start_of_local_day(
+                now.date() + timedelta(days=1)
+            ) + timedelta(minutes=publish_time + ARRIVAL_MARGIN)
+        return first_attempt - now
+    if now < first_attempt:
+        return first_attempt - now
+    return timedelta(
+        minutes=min(RETRY_INTERVAL * 2 ** max(attempts - 1, 0), LATE_POLL_INTERVAL)
+    )
 
 
-async def async_remove_config_entry_device(
-    hass: HomeAssistant, entry: ConfigEntry, device
-) -> bool:
-    """Remove a device.
+def leading_complete_days(days: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Return the days before the first partially published day.
 
     Arguments:
-        hass (HomeAssistant): The Home Assistant instance.
-        entry (ConfigEntry): Not used.
-        device: The device instance.
+        days (list[dict[str, Any]]): Days of usage returned by SEW, in date order
 
     Returns:
-        bool: Whether the removal completed successfully.
+        list[dict[str, Any]]: The fully published days
 
     """
-    dr(hass).async_remove_device(device.id)
-    return True
+    complete = []
+    for day in days:
+        if not day["readings"] or None in day["readings"]:
+            break
+        complete.append(day)
+    return complete
+
+
+class SEWDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+    """Fetches and imports South East Water usage once it has been published."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        collector: Collector,
+        entry: ConfigEntry | None = None,
+    ) -> None:
+        """Initialise the coordinator.
+
+        Arguments:
+            hass (HomeAssistant): The Home Assistant instance.
+            collector (Collector): The collector that retrieves usage from SEW.
+            entry (ConfigEntry, optional): The integration entry instance. Defaults to None.
+
+        """
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=timedelta(minutes=RETRY_INTERVAL),
+        )
+        self.collector: Collector = collector
+        self.entry: ConfigEntry | None = entry
+        self.last_date: date | None = None
+        self.totals: dict[str, dict[str, Any]] = {}
+        # one import at a time per statistic, so a running total is never read stale
+        self._import_locks: defaultdict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self.arrivals: list[int] = []
+        self.attempts: int = 0
+        self._last_attempt: dt | None = None
+        self._version: str = ""
+        self._store: Store | None = (
+            Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}")
+            if entry is not None
+            else None
+        )
+        self.readings: ReadingStore | None = (
+            ReadingStore(hass, entry.entry_id) if entry is not None else None
+        )
+        self.backfill: BackfillProgress = BackfillProgress()
+        self.aggregates: UsageAggregates = UsageAggregates()
+        self.leaks: LeakDetector = LeakDetector()
+        self.startup: dict[str, Any] = {}
+
+    @property
+    def get_version(self) -> str:
+        """Return the integration version.
+
+        Returns:
+            str: The integration version
+
+        """
+        return self._version
+
+    async def async_init(self) -> None:
+        """Load the integration version, the last imported date and the running totals."""
+        try:
+            integration = await async_get_integration(self.hass, DOMAIN)
+            self._version = str(integration.version)
+        except Exception:  # noqa: BLE001
+            _LOGGER.debug("Unable to determine integration version")
+
+        if self._store is not None and (stored := await self._store.async_load()):
+            if stored.get(LAST_DATE):
+                self.last_date = date.fromisoformat(stored[LAST_DATE])
+            self.totals = stored.get(TOTALS) or {}
+            self.arrivals = stored.get(ARRIVALS) or []
+
+        if self.entry is not None:
+            for key in METER_SENSORS.values():
+                stat_id = get_stat_id(self.hass, self.entry, key)
+                if stat_id is not None and stat_id in self.totals:
+                    self.collector.observation_data[key] = self.totals[stat_id][TOTAL]
+
+        if self.readings is not None:
+            await self.readings.async_load()
+            self._rebuild_aggregates()
+
+    async def async_startup(self, budget: float = STARTUP_BUDGET) -> None:
+        """Publish the restored state, then check browserless and run the first refresh.
+
+        This runs in the background once the entities are added. A refresh still going
+        when the budget runs out is abandoned, and the next scheduled refresh picks up
+        any fetch it started.
+
+        Arguments:
+            budget (float, optional): Seconds allowed for the first refresh. Defaults to STARTUP_BUDGET.
+
+        """
+        self.async_update_listeners()
+        started = time.monotonic()
+        try:
+            async with asyncio.timeout(budget):
+                await self.collector.async_setup()
+                await self.async_refresh()
+        except TimeoutError:
+            _LOGGER.warning(
+                "First refresh did not finish within %d seconds, continuing in the background",
+                budget,
+            )
+            self.startup[FIRST_REFRESH] = "timeout"
+        else:
+            self.startup[FIRST_REFRESH] = (
+                "success" if self.last_update_success else "failed"
+            )
+        self.startup[FIRST_REFRESH_TIME] = round((time.monotonic() - started) * 1000)
+
+    def _rebuild_aggregates(self) -> None:
+        """Fill the rolling aggregates and leak detector from the stored mains readings."""
+        serial = self.collector.get_mains_water_serial()
+        if self.readings is None or (last := self.readings.last_date(serial)) is None:
+            return
+        self._add_complete_days(
+            self.readings.get_days(
+                serial, last - timedelta(days=AGGREGATE_DAYS - 1), last
+            ),
+            notify=False,
+        )
+
+    def _add_complete_days(
+        self, days: list[dict[str, Any]], notify: bool = True
+    ) -> None:
+        """Add complete days of mains usage to the rolling aggregates and leak detector.
+
+        Arguments:
+            days (list[dict[str, Any]]): Days of mains usage, in date order
+            notify (bool, optional): Fire an event when a leak is first suspected. Defaults to True.
+
+        """
+        for day in days:
+            if not day["readings"] or None in day["readings"]:
+                continue
+            day_date = get_day_date(day)
+            self.aggregates.add_day(day_date, day["readings"])
+            if self.leaks.add_day(day_date, day["readings"]) and notify:
+                _LOGGER.warning("Possible leak on %s: %s", day_date, self.leaks.reasons)
+                self.hass.bus.async_fire(
+                    EVENT_LEAK_DETECTED,
+                    {
+                        "entry_id": self.entry.entry_id if self.entry else None,
+                        **self.leaks.get_attributes(),
+                    },
+                )
+
+    def get_meters(self) -> dict[str, str]:
+        """Return the serial of each configured meter.
+
+        Returns:
+            dict[str, str]: Meter serials keyed by mains and recycled
+
+        """
+        meters = {USAGE_MAINS: self.collector.get_mains_water_serial()}
+        if (recycled := self.collector.get_recycled_water_serial()) is not None:
+            meters[USAGE_RECYCLED] = recycled
+        return meters
+
+    async def async_get_usage(
+        self, date_from: date, date_to: date
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Return usage for a range of dates, fetching only days that are not stored.
+
+        Arguments:
+            date_from (date): The first date
+            date_to (date): The last date
+
+        Returns:
+            dict[str, list[dict[str, Any]]]: Days of usage, keyed by mains and recycled
+
+        """
+        if self.readings is None:
+            return await self.collector.async_get_usage(date_from, date_to)
+
+        meters = self.get_meters()
+        missing = sorted(
+            {
+                day_date
+                for serial in meters.values()
+                for day_date in self.readings.missing_dates(serial, date_from, date_to)
+            }
+        )
+        if missing:
+            usage = await self.collector.async_get_usage(missing[0], missing[-1])
+            for meter, days in usage.items():
+                if meter in meters:
+                    self.readings.add_days(meters[meter], days)
+        else:
+            _LOGGER.debug("Usage from %s to %s already stored", date_from, date_to)
+
+        return {
+            meter: self.readings.get_days(serial, date_from, date_to)
+            for meter, serial in meters.items()
+        }
+
+    def get_total(self, stat_id: str) -> float | None:
+        """Return the running total of a statistic id.
+
+        The total is kept in storage as each import lands, so no statistics need
+        to be read for imports that follow on from the last one.
+
+        Arguments:
+            stat_id (str): The statistic id
+
+        Returns:
+            float | None: The running total after the last imported hour, or None if nothing is stored
+
+        """
+        if stat_id in self.totals:
+            return self.totals[stat_id][TOTAL]
+        return None
+
+    def get_last_hour(self, stat_id: str) -> dt | None:
+        """Return the start of the last hour imported to a statistic id.
+
+        Arguments:
+            stat_id (str): The statistic id
+
+        Returns:
+            dt | None: The start of the last imported hour, or None if nothing is stored
+
+        """
+        if stat_id in self.totals and self.totals[stat_id].get(LAST_HOUR):
+            return dt.fromisoformat(self.totals[stat_id][LAST_HOUR])
+        return None
+
+    def _count_attempt(self, now: dt) -> None:
+        """Count an attempt that did not find yesterday's readings.
+
+        Arguments:
+            now (dt): The local time of the attempt
+
+        """
+        self.attempts += 1
+        self._last_attempt = now
+
+    def landed(self) -> bool:
+        """Return whether yesterday's readings have already been imported.
+
+        Returns:
+            bool: True if there is nothing new to fetch today
+
+        """
+        yesterday = dt_util.now().date() - timedelta(days=1)
+        return self.last_date is not None and self.last_date >= yesterday
+
+    def split_revisions(
+        self, serial: str, days: list[dict[str, Any]]
+    ) -> tuple[list[dict[str, Any]], list[tuple[dict[str, Any], dict[str, Any]]]]:
+        """Split fetched days into days to import whole and days to revise.
+
+        Days whose readings match the revision already imported are dropped. Days
+        imported before with different readings are revised hour by hour, unless the
+        readings that were imported are no longer known.
+
+        Arguments:
+            serial (str): The meter serial
+            days (list[dict[str, Any]]): Days of usage, in date order
+
+        Returns:
+            tuple[list[dict[str, Any]], list[tuple[dict[str, Any], dict[str, Any]]]]: The days to import, and each day to revise as imported and as fetched
+
+        """
+        if self.readings is None:
+            return days, []
+        new_days: list[dict[str, Any]] = []
+        revisions: list[tuple[dict[str, Any], dict[str, Any]]] = []
+        for day in days:
+            day_date = get_day_date(day)
+            imported = self.readings.get_imported_revision(serial, day_date)
+            if imported is None:
+                new_days.append(day)
+            elif imported == self.readings.get_revision(serial, day_date):
+                continue
+            elif (old_day := self.readings.get_imported_day(serial, day_date)) is None:
+                new_days.append(day)
+            else:
+                revisions.append((old_day, day))
+        return new_days, revisions
+
+    async def async_import_usage(
+        self,
+        date_from: date,
+        date_to: date,
+        stat_id: str | None = None,
+        complete_only: bool = False,
+        only_dates: set[date] | None = None,
+        recheck_from: date | None = None,
+    ) -> int:
+        """Fetch usage for a range of dates and import it into statistics.
+
+        Days already imported to the integration's own sensors are only written again
+        for the hours that changed since. Imports to the same statistic from the
+        scheduled refresh, a backfill and the import service run one at a time, and
+        each reads the running total only once it has its turn.
+
+        Arguments:
+            date_from (date): The first date to import
+            date_to (date): The last date to import
+            stat_id (str, optional): The statistic id for mains usage. Defaults to the mains sensor.
+            complete_only (bool, optional): Stop at the first partially published day. Defaults to False.
+            only_dates (set[date], optional): Import only these dates from the range. Defaults to None.
+            recheck_from (date, optional): Also revise days already imported from this date. Defaults to None.
+
+        Returns:
+            int: The number of complete days imported for the mains meter
+
+        """
+        try:
+            usage = await self.async_get_usage(
+                min(recheck_from, date_from) if recheck_from else date_from, date_to
+            )
+        finally:
+            self._async_update_issues()
+        meters = self.get_meters()
+        complete = 0
+
+        for meter, days in usage.items():
+            rechecked = [day for day in days if get_day_date(day) < date_from]
+            days = [day for day in days if get_day_date(day) >= date_from]
+            if complete_only:
+                days = leading_complete_days(days)
+            if only_dates is not None:
+                days = [day for day in days if get_day_date(day) in only_dates]
+            key = METER_SENSORS[meter]
+            own_stat_id = (
+                get_stat_id(self.hass, self.entry, key)
+                if self.entry is not None
+                else None
+            )
+            meter_stat_id = stat_id if meter == USAGE_MAINS and stat_id else own_stat_id
+            if meter_stat_id is None:
+                _LOGGER.warning("No statistic id found for %s usage, skipping", meter)
+                continue
+
+            async with self._import_locks[meter_stat_id]:
+                tracked = self.readings is not None and meter_stat_id == own_stat_id
+                revisions: list[tuple[dict[str, Any], dict[str, Any]]] = []
+                new_days = days
+                if tracked and only_dates is None:
+                    new_days, revisions = self.split_revisions(meters[meter], days)
+                    revisions = (
+                        self.split_revisions(meters[meter], rechecked)[1] + revisions
+                    )
+
+                started = time.monotonic()
+                tally, last_hour = await async_import_usage(
+                    self.hass,
+                    meter_stat_id,
+                    new_days,
+                    self.get_total(meter_stat_id),
+                    self.get_last_hour(meter_stat_id),
+                )
+                if revisions:
+                    tally, last_hour = await async_revise_usage(
+                        self.hass, meter_stat_id, revisions, tally, last_hour
+                    )
+                self.collector.metrics.record(
+                    METRIC_RECORDER_WRITE, round((time.monotonic() - started) * 1000)
+                )
+                if tally is not None and last_hour is not None:
+                    self.totals[meter_stat_id] = {
+                        TOTAL: tally,
+                        LAST_HOUR: last_hour.isoformat(),
+                    }
+                    self.collector.observation_data[key] = tally
+                    await self._async_save()
+                if tracked:
+                    self.readings.mark_imported(
+                        meters[meter],
+                        [get_day_date(day) for day in new_days]
+                        + [get_day_date(day) for _, day in revisions],
+                    )
+
+            if meter == USAGE_MAINS:
+                self._add_complete_days(days)
+                complete_days = [
+                    get_day_date(day) for day in leading_complete_days(days)
+                ]
+                complete = len(complete_days)
+                if complete_days and (
+                    self.last_date is None or max(complete_days) > self.last_date
+                ):
+                    self.last_date = max(complete_days)
+                    await self._async_save()
+
+        self.async_update_listeners()
+        return complete
+
+    async def async_backfill(
+        self, date_from: date | None = None, date_to: date | None = None
+    ) -> None:
+        """Find every day missing from the mains statistics and import them as a batch.
+
+        Arguments:
+            date_from (date, optional): The first date to check. Defaults to the meter install date.
+            date_to (date, optional): The last date to check. Defaults to yesterday.
+
+        Raises:
+            HomeAssistantError: When a backfill is already running
+
+        """
+        if self.backfill.state == BACKFILL_RUNNING:
+            raise HomeAssistantError("A backfill is already running")
+
+        date_to = date_to or dt_util.now().date() - timedelta(days=1)
+        date_from = date_from or self.collector.get_install_date() or date_to
+
+        imported: set[date] = set()
+        if self.entry is not None and (
+            stat_id := get_stat_id(self.hass, self.entry, SENSOR_MAINS)
+        ):
+            imported = await async_get_imported_dates(
+                self.hass, stat_id, date_from, date_to
+            )
+
+        missing = [
+            day_date
+            for day_date in dates_between(date_from, date_to)
+            if day_date not in imported
+        ]
+        ranges = plan_backfill(missing)
+        _LOGGER.debug(
+            "Backfilling %d missing days in %d fetches", len(missing), len(ranges)
+        )
+        self.backfill.start(missing, ranges)
+        self._async_update_backfill()
+
+        while self.backfill.ranges:
+            range_from, range_to = self.backfill.current = self.backfill.ranges[0]
+            self._async_update_backfill()
+            try:
+                await self.async_import_usage(
+                    range_from, range_to, only_dates=set(missing)
+                )
+            except Exception as ex:  # noqa: BLE001
+                _LOGGER.error(
+                    "Backfill from %s to %s failed: %s", range_from, range_to, ex
+                )
+                self.backfill.state = BACKFILL_FAILED
+                self.backfill.error = str(ex)
+                self._async_update_backfill()
+                return
+
+            self.backfill.done_days += count_missing_in(missing, range_from, range_to)
+            self.backfill.ranges.pop(0)
+
+        self.backfill.current = None
+        self.backfill.state = BACKFILL_COMPLETE
+        self._async_update_backfill()
+
+    def _async_update_backfill(self) -> None:
+        """Publish the backfill progress to the sensors."""
+        self.collector.observation_data[SENSOR_BACKFILL] = self.backfill.percent
+        self.async_update_listeners()
+
+    async def _async_record_arrival(self, now: dt) -> None:
+        """Record when yesterday's readings landed, keeping the last ARRIVAL_HISTORY days.
+
+        Arguments:
+            now (dt): The local time the readings were found
+
+        """
+        last_attempt = self._last_attempt
+        if last_attempt is not None and last_attempt.date() != now.date():
+            last_attempt = None
+        self.arrivals = [*self.arrivals, estimate_arrival(now, last_attempt)][
+            -ARRIVAL_HISTORY:
+        ]
+        _LOGGER.debug(
+            "Readings landed after %d attempts, next expected at %d minutes past midnight",
+            self.attempts + 1,
+            predict_publish_time(self.arrivals),
+        )
+        await self._async_save()
+
+    def _async_update_issues(self) -> None:
+        """Raise a repair issue for each endpoint whose breaker is open, and clear the rest."""
+        for breaker in self.collector.get_breakers():
+            issue_id = f"{ISSUE_CIRCUIT_OPEN}_{slugify(breaker.name)}"
+            if breaker.state == BREAKER_OPEN:
+                ir.async_create_issue(
+                    self.hass,
+                    DOMAIN,
+                    issue_id,
+                    is_fixable=False,
+                    severity=ir.IssueSeverity.WARNING,
+                    translation_key=ISSUE_CIRCUIT_OPEN,
+                    translation_placeholders={
+                        "name": breaker.name,
+                        "failures": str(breaker.failures),
+                        "retry_at": breaker.get_retry_time(),
+                        "error": breaker.last_error or "",
+                    },
+                )
+            else:
+                ir.async_delete_issue(self.hass, DOMAIN, issue_id)
+
+    async def _async_save(self) -> None:
+        """Persist the last imported date, the running totals and the arrival history."""
+        if self._store is not None:
+            await self._store.async_save(
+                {
+                    LAST_DATE: self.last_date.isoformat() if self.last_date else None,
+                    TOTALS: self.totals,
+                    ARRIVALS: self.arrivals,
+                }
+            )
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Import any days since the last imported date once SEW has published them.
+
+        Raises:
+            UpdateFailed: When the usage could not be retrieved
+
+        Returns:
+            dict[str, Any]: The sensor values
+
+        """
+        now = dt_util.now()
+        yesterday = now.date() - timedelta(days=1)
+        publish_time = predict_publish_time(self.arrivals)
+        if self._last_attempt is not None and self._last_attempt.date() != now.date():
+            self.attempts = 0
+
+        if not self.landed() and now >= dt_util.start_of_local_day(now) + timedelta(
+            minutes=publish_time
+        ):
+            date_from = (
+                self.last_date + timedelta(days=1)
+                if self.last_date is not None
+                else yesterday
+            )
+            try:
+                await self.async_import_usage(
+                    date_from,
+                    yesterday,
+                    complete_only=True,
+                    recheck_from=yesterday - timedelta(days=REVISION_RECHECK_DAYS),
+                )
+            except Exception as ex:
+                self._count_attempt(now)
+                self.update_interval = get_next_update(
+                    now, False, publish_time, self.attempts
+                )
+                raise UpdateFailed(f"Unable to retrieve water usage: {ex}") from ex
+
+            if self.landed():
+                await self._async_record_arrival(now)
+                self.attempts = 0
+            else:
+                self._count_attempt(now)
+
+        self.update_interval = get_next_update(
+            dt_util.now(),
+            self.landed(),
+            predict_publish_time(self.arrivals),
+            self.attempts,
+        )
+        _LOGGER.debug("Next usage refresh in %s", self.update_interval)
+        return dict(self.collector.observation_data)
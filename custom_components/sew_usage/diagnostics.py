@@ -18,6 +18,16 @@ async def async_get_config_entry_diagnostics(
 ) -> dict[str, Any]:
     """Return diagnostics for a config entry."""
 
+    coordinator = entry.runtime_data.coordinator
+    collector = coordinator.collector
     return {
         "config_entry_data": async_redact_data(dict(entry.data), TO_REDACT),
+        "startup": coordinator.startup,
+        "browserless": collector.get_browserless_metrics(),
+        "portal_breaker": collector.portal_breaker.as_dict(),
+        "retry_budget": collector.retry_budget.as_dict(),
+        "metrics": collector.metrics.as_dict(),
+        "timings": collector.timings,
+        "aggregates": coordinator.aggregates.get_values(),
+        "leaks": coordinator.leaks.get_attributes(),
     }
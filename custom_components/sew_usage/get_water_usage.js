@@ -0,0 +1,329 @@
+// test if string (e.g. recycled meter serial) is blank
+const isBlank = function (str) {
+  return !!!str || /^\s*$/.test(str);
+};
+
+// construct man body for aura including date and meter serial
+// Added new datafill for req_body
+const req_body = function (date_for, meter_serial, account_num, auraToken) {
+  return req_body_range(date_for, date_for, meter_serial, account_num, auraToken);
+};
+
+// construct man body for aura covering a range of dates for one meter serial
+const req_body_range = function (date_from, date_to, meter_serial, account_num, auraToken) {
+  return req_body_actions(
+    [{ id: "1084;a", meter_serial: meter_serial, date_from: date_from, date_to: date_to }],
+    account_num,
+    auraToken
+  );
+};
+
+// construct man body for aura carrying one getUsageData action per request, so several meters and date ranges share a POST
+const req_body_actions = function (requests, account_num, auraToken) {
+  const message = {
+    actions: requests.map((request) => ({
+      id: request.id,
+      descriptor: "aura://ApexActionController/ACTION$execute",
+      callingDescriptor: "UNKNOWN",
+      params: {
+        namespace: "",
+        classname: "MysewUsageBillingGraphController",
+        method: "getUsageData",
+        params: {
+          baId: account_num,
+          meterId: request.meter_serial,
+          dateFrom: request.date_from,
+          dateTo: request.date_to,
+          resolution: "hourly",
+        },
+        cacheable: false,
+        isContinuation: false,
+      },
+    })),
+  };
+  return (
+    "message=" +
+    encodeURIComponent(JSON.stringify(message)) +
+    "&aura.context=%7B%22mode%22%3A%22PROD%22%2C%22fwuid%22%3A%22REdtNUF5ejJUNWxpdVllUjQtUzV4UTFLcUUxeUY3ZVB6dE9hR0VheDVpb2cxMy4zMzU1NDQzMi41MDMzMTY0OA%22%2C%22app%22%3A%22siteforce%3AcommunityApp%22%2C%22loaded%22%3A%7B%22APPLICATION%40markup%3A%2F%2Fsiteforce%3AcommunityApp%22%3A%221422_wotCJi-4iLy4EgTPC6RQ4g%22%7D%2C%22dn%22%3A%5B%5D%2C%22globals%22%3A%7B%22srcdoc%22%3Atrue%7D%2C%22uad%22%3Atrue%7D" +
+    "&aura.pageURI=%2Fs%2Fusage&aura.token=" +
+    encodeURIComponent(auraToken)
+  );
+};
+
+// split an aura response into the days returned for each action id
+const parse_actions = function (usage_data) {
+  let text = usage_data.startsWith("while(1);") ? usage_data.slice(9) : usage_data;
+  let days = {};
+  for (const action of JSON.parse(text).actions || []) {
+    if (action.state !== "SUCCESS") {
+      throw new Error("aura action " + action.id + " failed: " + JSON.stringify(action.error || []));
+    }
+    days[action.id] = (action.returnValue && action.returnValue.returnValue) || [];
+  }
+  return days;
+};
+
+// maximum number of days requested in a single aura call - longer ranges are split into chunks
+const MAX_RANGE_DAYS = 31;
+
+// maximum number of actions sent in a single aura POST
+const MAX_ACTIONS = 12;
+
+// maximum time to wait for the portal at each step of the login
+const WAIT_TIMEOUT = 30000;
+
+// time each phase of a fetch, recording the milliseconds since the previous mark
+const new_timer = function () {
+  let last = Date.now();
+  let timings = { aura: [] };
+  return {
+    timings: timings,
+    mark: function (phase) {
+      let now = Date.now();
+      if (Array.isArray(timings[phase])) {
+        timings[phase].push(now - last);
+      } else {
+        timings[phase] = now - last;
+      }
+      last = now;
+    },
+  };
+};
+
+// add a number of days to a yyyy-mm-dd date string
+const add_days = function (date_str, days) {
+  let date = new Date(date_str + "T00:00:00Z");
+  date.setUTCDate(date.getUTCDate() + days);
+  return date.toISOString().split("T")[0];
+};
+
+// post an aura body from within the logged in page and return the raw response text
+const get_usage = async function (page, body, timer) {
+  let usage = await page.evaluate((body) => {
+    return fetch(
+      "https://my.southeastwater.com.au/s/sfsites/aura?r=26&aura.ApexAction.execute=1",
+      {
+        headers: {
+          accept: "*/*",
+          "accept-language": "en-US,en;q=0.9,nb;q=0.8",
+          "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
+          "x-sfdc-lds-endpoints": "ApexActionController.execute:MysewUsageBillingGraphController.getUsageData",
+          priority: "u=1, i",
+        },
+        referrer: "https://my.southeastwater.com.au/s/usage",
+        referrerPolicy: "origin-when-cross-origin",
+        body: body,
+        method: "POST",
+        mode: "cors",
+        credentials: "include",
+      }
+    ).then((response) => response.text());
+  }, body);
+  timer.mark("aura");
+  return usage;
+};
+
+// get every day from date_from to date_to for each meter, packing every meter and chunk into as few POSTs as possible
+// and re-queuing any chunk the portal caps from the day after the last one it returned
+const get_usage_ranges = async function (page, meters, date_from, date_to, account_num, auraToken, timer) {
+  let days = {};
+  let pending = [];
+  let next_id = 0;
+
+  for (const meter of Object.keys(meters)) {
+    days[meter] = {};
+    let chunk_from = date_from;
+    while (chunk_from <= date_to) {
+      let chunk_to = add_days(chunk_from, MAX_RANGE_DAYS - 1);
+      if (chunk_to > date_to) {
+        chunk_to = date_to;
+      }
+      pending.push({ meter: meter, meter_serial: meters[meter], date_from: chunk_from, date_to: chunk_to });
+      chunk_from = add_days(chunk_to, 1);
+    }
+  }
+
+  while (pending.length > 0) {
+    let batch = pending.splice(0, MAX_ACTIONS).map((request) => ({ ...request, id: next_id++ + ";a" }));
+    let returned = parse_actions(await get_usage(page, req_body_actions(batch, account_num, auraToken), timer));
+
+    for (const request of batch) {
+      // keep the latest day returned so that a capped response resumes from the day after it
+      let last_date = null;
+      for (const day of returned[request.id] || []) {
+        let day_date = day.apiDate.split("T")[0];
+        days[request.meter][day_date] = day;
+        if (last_date === null || day_date > last_date) {
+          last_date = day_date;
+        }
+      }
+
+      // no progress made means the portal has nothing further for this range
+      if (last_date !== null && last_date >= request.date_from && last_date < request.date_to) {
+        pending.push({ ...request, date_from: add_days(last_date, 1) });
+      }
+    }
+  }
+
+  let usage = {};
+  for (const meter of Object.keys(days)) {
+    usage[meter] = Object.keys(days[meter])
+      .sort()
+      .map((day_date) => days[meter][day_date]);
+  }
+  return usage;
+};
+
+export default async function ({ page, context }) {
+  const {
+    sew_username,
+    sew_password,
+    get_recycled,
+    target_date,
+    date_from,
+    date_to,
+    return_session,
+    login_only,
+    login_timeout,
+    default_baId,
+    default_meterId,
+    //recycled_water_serial will almost certainly need to be retrieved from local storage as well, but left here as a TODO
+    recycled_water_serial, //TODO
+  } = context;
+
+  var target_unix_date = new Date();
+
+  if (isBlank(target_date)) {
+    // Use Yesterday's date
+    let yesterdayDate = new Date();
+    yesterdayDate.setDate(yesterdayDate.getDate() - 1);
+    yesterdayDate.setHours(0, 0, 0, 0);
+    target_unix_date = yesterdayDate.valueOf();
+  } else {
+    // cast date parameter to date only and convert to unix format
+    let date = new Date(target_date);
+    date.setHours(0, 0, 0, 0);
+    target_unix_date = date.toISOString().split('T')[0];
+    //target_unix_date = date.valueOf();
+  }
+
+  // only check for recycled if the flag is passed or the meter serial is non-blank
+  let recycled = new Boolean();
+  recycled = !isBlank(recycled_water_serial) || get_recycled;
+
+  const timer = new_timer();
+
+  // Navigate to SEW website
+  await page.goto("https://my.southeastwater.com.au/s/login/");
+
+  // Type in username
+  const username = await page.waitForSelector("input[name=\x22username\x22]", {
+    timeout: 5000,
+  });
+  await username.type(sew_username);
+
+  // Type in password
+  const password = await page.waitForSelector("input[name=\x22password\x22]", {
+    timeout: 5000,
+  });
+  await password.type(sew_password);
+
+  // Perform login
+  try {
+    await Promise.all([
+      page.keyboard.press("Enter"),
+      page.waitForNavigation({ timeout: login_only && login_timeout ? login_timeout : WAIT_TIMEOUT }),
+    ]);
+  } catch (e) {
+    if (login_only || page.url().includes("/s/login")) {
+      // the portal stays on the login page when the credentials are rejected
+      return { login: false, timings: timer.timings };
+    }
+    throw e;
+  }
+  timer.mark("login");
+
+  if (login_only) {
+    // credential check only: leaving the login page is enough, no usage is fetched
+    return { login: !page.url().includes("/s/login"), timings: timer.timings };
+  }
+
+  // Goto Usage Page to get the required localStorage data for account_num and mains_water_serial, once its network settles
+  await page.goto("https://my.southeastwater.com.au/s/usage", { waitUntil: "networkidle2", timeout: WAIT_TIMEOUT });
+  timer.mark("navigation");
+
+  // wait for the aura token, and the account details unless defaults were passed, to appear in localStorage
+  await page.waitForFunction(
+    (has_defaults) =>
+      !!localStorage.getItem("$AuraClientService.token$siteforce:communityApp") &&
+      (has_defaults || !!localStorage.getItem("1")),
+    { timeout: WAIT_TIMEOUT },
+    !isBlank(default_baId) && !isBlank(default_meterId)
+  );
+
+  //Cache Local Storage and extract account_num and _mains_water_serial
+  const localStorage = await page.evaluate(() => JSON.stringify(localStorage));
+  const localStorageObj = JSON.parse(localStorage);
+  const auraToken = localStorageObj["$AuraClientService.token$siteforce:communityApp"];
+  let account_num = localStorageObj['1'];
+  let mains_water_serial = localStorageObj['2'];
+  timer.mark("token");
+
+  if (!isBlank(default_baId)) {
+    // the configured account wins, so accounts with several meters read the right one
+    account_num = default_baId;
+  }
+
+  if (!isBlank(default_meterId)) {
+    // likewise the configured serial, which the direct aura path uses too
+    mains_water_serial = default_meterId;
+  }
+
+  // session details returned so that later fetches can reuse this login
+  let session = null;
+  if (return_session) {
+    session = {
+      cookies: await page.cookies(),
+      aura_token: auraToken,
+      account_num: account_num,
+      meter_serial: mains_water_serial,
+    };
+  }
+
+  if (!isBlank(date_from)) {
+    // Range mode - fetch every day from date_from to date_to using this one login
+    let range_to = isBlank(date_to) ? date_from : date_to;
+    let meters = { mains: mains_water_serial };
+    if (recycled) {
+      meters.recycled = recycled_water_serial;
+    }
+    let range_usage = await get_usage_ranges(page, meters, date_from, range_to, account_num, auraToken, timer);
+    if (session) {
+      range_usage.session = session;
+    }
+    range_usage.timings = timer.timings;
+    return range_usage;
+  }
+
+  //get aura body query for mains, and recycled if needed, as one POST
+  var requests = [{ id: "mains", meter_serial: mains_water_serial, date_from: target_unix_date, date_to: target_unix_date }];
+  if (recycled) {
+    requests.push({ id: "recycled", meter_serial: recycled_water_serial, date_from: target_unix_date, date_to: target_unix_date });
+  }
+  var body = req_body_actions(requests, account_num, auraToken);
+
+  //get water meter readings and split them by meter
+  var usage_data = parse_actions(await get_usage(page, body, timer));
+
+  var combined_usage = {
+    mains: usage_data.mains[0],
+  };
+  if (recycled) {
+    combined_usage.recycled = usage_data.recycled[0];
+  }
+  if (session) {
+    combined_usage.session = session;
+  }
+  combined_usage.timings = timer.timings;
+  return combined_usage;
+}
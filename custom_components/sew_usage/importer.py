@@ -0,0 +1,372 @@
+"""Import SEW usage into Home Assistant long term statistics."""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, time, timedelta
+from datetime import datetime as dt
+from typing import Any
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_import_statistics,
+    get_last_statistics,
+    statistics_during_period,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import UnitOfVolume
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from .series import UsageSeries, get_hour_amounts
+
+_LOGGER = logging.getLogger(__name__)
+
+LAST_SUM_LOOKBACK = 31
+
+
+def get_day_date(day: dict[str, Any]) -> date:
+    """Return the local date a day of SEW usage covers.
+
+    SEW reports the day as midnight UTC, although the readings are for the local day.
+
+    Arguments:
+        day (dict[str, Any]): A day of usage returned by SEW
+
+    Returns:
+        date: The local date of the readings
+
+    """
+    return date.fromisoformat(day["apiDate"][:10])
+
+
+def get_stat_id(hass: HomeAssistant, entry: ConfigEntry, key: str) -> str | None:
+    """Return the entity id of an integration sensor, used as its statistic id.
+
+    Arguments:
+        hass (HomeAssistant): The Home Assistant instance.
+        entry (ConfigEntry): The integration entry instance.
+        key (str): The sensor key, e.g. water_usage_mains
+
+    Returns:
+        str | None: The entity id, or None if the sensor is not registered
+
+    """
+    registry = er.async_get(hass)
+    for entity in er.async_entries_for_config_entry(registry, entry.entry_id):
+        if entity.translation_key == key:
+            return entity.entity_id
+    return None
+
+
+def build_statistics(
+    days: list[dict[str, Any]], starting_point: float
+) -> tuple[list[StatisticData], float]:
+    """Build hourly statistic rows for days of usage.
+
+    Arguments:
+        days (list[dict[str, Any]]): Days of usage returned by SEW, in date order
+        starting_point (float): The tally the first reading is added to
+
+    Returns:
+        tuple[list[StatisticData], float]: The statistic rows and the tally after the last reading
+
+    """
+    tally = starting_point
+    stats: list[StatisticData] = []
+
+    for start, tally in UsageSeries.from_days(days).iter_hours(starting_point):
+        stats.append(
+            StatisticData(
+                start=dt_util.utc_from_timestamp(start),
+                state=tally,
+                sum=tally,
+                max=tally,
+            )
+        )
+
+    return stats, tally
+
+
+def get_metadata(stat_id: str) -> StatisticMetaData:
+    """Return the statistic metadata for a water usage statistic id.
+
+    Arguments:
+        stat_id (str): The statistic id
+
+    Returns:
+        StatisticMetaData: The metadata of an hourly sum in litres
+
+    """
+    return StatisticMetaData(
+        has_mean=False,
+        has_sum=True,
+        name=None,
+        source="recorder",
+        statistic_id=stat_id,
+        unit_of_measurement=UnitOfVolume.LITERS,
+    )
+
+
+def diff_hours(old_day: dict[str, Any], new_day: dict[str, Any]) -> dict[float, float]:
+    """Return the hours of a day whose reading changed, appeared or disappeared.
+
+    Arguments:
+        old_day (dict[str, Any]): The day as last imported
+        new_day (dict[str, Any]): The day as fetched since
+
+    Returns:
+        dict[float, float]: The change in litres, keyed by the UTC timestamp of each changed hour start
+
+    """
+    day_date = get_day_date(new_day)
+    old = get_hour_amounts(day_date, old_day["readings"])
+    new = get_hour_amounts(day_date, new_day["readings"])
+    return {
+        start: new.get(start, 0.0) - old.get(start, 0.0)
+        for start in sorted(old.keys() | new.keys())
+        if start not in old or start not in new or old[start] != new[start]
+    }
+
+
+def get_last_sum(hass: HomeAssistant, stat_id: str, before: dt) -> float | None:
+    """Return the sum of the last hourly statistic starting before a time.
+
+    A month before the time is checked first, and the whole history only if that
+    month has no statistics.
+
+    Arguments:
+        hass (HomeAssistant): The Home Assistant instance.
+        stat_id (str): The statistic id
+        before (dt): The time the statistic must start before
+
+    Returns:
+        float | None: The sum, or None if there are no earlier statistics
+
+    """
+    for start in (
+        before - timedelta(days=LAST_SUM_LOOKBACK),
+        dt_util.utc_from_timestamp(0),
+    ):
+        rows = statistics_during_period(
+            hass, start, before, {stat_id}, "hour", None, {"sum"}
+        ).get(stat_id)
+        if rows:
+            return rows[-1]["sum"]
+    return None
+
+
+def split_runs(days: list[dict[str, Any]]) -> list[list[dict[str, Any]]]:
+    """Split days of usage into runs of consecutive dates.
+
+    Arguments:
+        days (list[dict[str, Any]]): Days of usage returned by SEW, in date order
+
+    Returns:
+        list[list[dict[str, Any]]]: The runs, in date order
+
+    """
+    runs: list[list[dict[str, Any]]] = []
+    for day in days:
+        if runs and get_day_date(day) - get_day_date(runs[-1][-1]) == timedelta(days=1):
+            runs[-1].append(day)
+        else:
+            runs.append([day])
+    return runs
+
+
+async def async_import_usage(
+    hass: HomeAssistant,
+    stat_id: str,
+    days: list[dict[str, Any]],
+    total: float | None,
+    last_hour: dt | None,
+) -> tuple[float | None, dt | None]:
+    """Import days of usage for a statistic id, in any order.
+
+    Days after the last imported hour simply continue the running total. Each run of
+    days that overlaps or precedes it starts from the last sum before the run, and
+    every later statistic is shifted by the change in the run's closing sum with a
+    single recorder adjustment.
+
+    Arguments:
+        hass (HomeAssistant): The Home Assistant instance.
+        stat_id (str): The statistic id to import to, e.g. sensor.water_usage_mains
+        days (list[dict[str, Any]]): Days of usage returned by SEW, in date order
+        total (float | None): The running total after the last imported hour, or None if unknown
+        last_hour (dt | None): The start of the last imported hour, or None if unknown
+
+    Returns:
+        tuple[float | None, dt | None]: The running total and the start of the last imported hour
+
+    """
+    metadata = get_metadata(stat_id)
+    recorder = get_instance(hass)
+
+    if last_hour is None:
+        # statistics imported before the running total was kept
+        await recorder.async_block_till_done()
+        last = await recorder.async_add_executor_job(
+            get_last_statistics, hass, 1, stat_id, False, {"sum"}
+        )
+        if rows := last.get(stat_id):
+            total = rows[0]["sum"]
+            last_hour = dt_util.utc_from_timestamp(rows[0]["start"])
+
+    for run in split_runs(days):
+        run_start = dt.combine(
+            get_day_date(run[0]), time(), tzinfo=dt_util.DEFAULT_TIME_ZONE
+        )
+
+        if total is not None and last_hour is not None and run_start > last_hour:
+            stats, tally = build_statistics(run, total)
+            if stats:
+                async_import_statistics(hass, metadata, stats)
+                total, last_hour = tally, stats[-1]["start"]
+            continue
+
+        # earlier imports must land before the sums around this run are read
+        await recorder.async_block_till_done()
+        base = await recorder.async_add_executor_job(
+            get_last_sum, hass, stat_id, run_start
+        )
+        stats, tally = build_statistics(run, base or 0.0)
+        if not stats:
+            continue
+
+        run_end = stats[-1]["start"] + timedelta(hours=1)
+        old_end = await recorder.async_add_executor_job(
+            get_last_sum, hass, stat_id, run_end
+        )
+        if old_end is None:
+            old_end = base or 0.0
+        delta = tally - old_end
+        async_import_statistics(hass, metadata, stats)
+
+        if last_hour is not None and last_hour >= run_end:
+            if delta:
+                recorder.async_adjust_statistics(
+                    stat_id, run_end, delta, UnitOfVolume.LITERS
+                )
+                _LOGGER.debug(
+                    "Shifted %s statistics from %s by %s", stat_id, run_end, delta
+                )
+            total = (total or 0.0) + delta
+        else:
+            total, last_hour = tally, stats[-1]["start"]
+
+    _LOGGER.debug(
+        "Queued statistic rows for %s covering %d days, running total %s",
+        stat_id,
+        len(days),
+        total,
+    )
+    return total, last_hour
+
+
+async def async_revise_usage(
+    hass: HomeAssistant,
+    stat_id: str,
+    revisions: list[tuple[dict[str, Any], dict[str, Any]]],
+    total: float | None,
+    last_hour: dt | None,
+) -> tuple[float | None, dt | None]:
+    """Import only the hours that changed in days already imported.
+
+    Each changed hour is written with its new sum, and every later statistic is
+    shifted by the change with one recorder adjustment per changed hour. Hours
+    that did not change are left alone.
+
+    Arguments:
+        hass (HomeAssistant): The Home Assistant instance.
+        stat_id (str): The statistic id to import to, e.g. sensor.water_usage_mains
+        revisions (list[tuple[dict[str, Any], dict[str, Any]]]): Each day as last imported and as fetched since
+        total (float | None): The running total after the last imported hour, or None if unknown
+        last_hour (dt | None): The start of the last imported hour, or None if unknown
+
+    Returns:
+        tuple[float | None, dt | None]: The running total and the start of the last imported hour
+
+    """
+    metadata = get_metadata(stat_id)
+    recorder = get_instance(hass)
+
+    for old_day, new_day in revisions:
+        changes = diff_hours(old_day, new_day)
+        if not changes:
+            continue
+        first = dt_util.utc_from_timestamp(next(iter(changes)))
+
+        # earlier imports must land before the sum ahead of the first change is read
+        await recorder.async_block_till_done()
+        tally = (
+            await recorder.async_add_executor_job(get_last_sum, hass, stat_id, first)
+            or 0.0
+        )
+        amounts = get_hour_amounts(get_day_date(new_day), new_day["readings"])
+        stats: list[StatisticData] = []
+        for start in sorted(amounts.keys() | changes.keys()):
+            hour = dt_util.utc_from_timestamp(start)
+            if hour < first:
+                continue
+            tally += amounts.get(start, 0.0)
+            if start not in changes:
+                continue
+            stats.append(StatisticData(start=hour, state=tally, sum=tally, max=tally))
+            if last_hour is None or hour > last_hour:
+                total, last_hour = tally, hour
+                continue
+            if changes[start]:
+                # rows for the changed hours are written after every shift, with their final sums
+                recorder.async_adjust_statistics(
+                    stat_id,
+                    hour + timedelta(hours=1),
+                    changes[start],
+                    UnitOfVolume.LITERS,
+                )
+                total = (total or 0.0) + changes[start]
+
+        async_import_statistics(hass, metadata, stats)
+        _LOGGER.debug(
+            "Revised %d hours of %s on %s",
+            len(stats),
+            stat_id,
+            get_day_date(new_day),
+        )
+
+    return total, last_hour
+
+
+async def async_get_imported_dates(
+    hass: HomeAssistant, stat_id: str, date_from: date, date_to: date
+) -> set[date]:
+    """Return the local dates that already have statistics.
+
+    Arguments:
+        hass (HomeAssistant): The Home Assistant instance.
+        stat_id (str): The statistic id
+        date_from (date): The first date
+        date_to (date): The last date
+
+    Returns:
+        set[date]: The dates with at least one hourly statistic row
+
+    """
+    start = dt_util.start_of_local_day(date_from)
+    end = dt_util.start_of_local_day(date_to + timedelta(days=1))
+    stats = await get_instance(hass).async_add_executor_job(
+        statistics_during_period,
+        hass,
+        start,
+        end,
+        {stat_id},
+        "day",
+        None,
+        {"change"},
+    )
+    return {
+        dt_util.as_local(dt_util.utc_from_timestamp(row["start"])).date()
+        for row in stats.get(stat_id, [])
+    }
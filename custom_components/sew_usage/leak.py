@@ -0,0 +1,183 @@
+"""Continuous flow and leak detection over imported hourly readings."""
+
+from __future__ import annotations
+
+from collections import deque
+from datetime import date
+from typing import Any
+
+from .const import (
+    LEAK_BASELINE_FACTOR,
+    LEAK_BASELINE_NIGHTS,
+    LEAK_CONTINUOUS_HOURS,
+    LEAK_MIN_NIGHT_FLOW,
+    LEAK_NIGHT_END,
+)
+
+LEAK_CONTINUOUS = "continuous_flow"
+LEAK_NIGHT_FLOW = "night_flow"
+
+
+class LeakDetector:
+    """Watches hourly readings, in order, for flow that never stops.
+
+    Two signals are tracked with fixed-size state and constant work per reading:
+    the number of consecutive hours with flow, and the minimum flow in the night
+    hours from midnight to LEAK_NIGHT_END, compared against the average minimum of
+    recent nights.
+    """
+
+    def __init__(
+        self,
+        nights: int = LEAK_BASELINE_NIGHTS,
+        continuous_hours: int = LEAK_CONTINUOUS_HOURS,
+        min_night_flow: float = LEAK_MIN_NIGHT_FLOW,
+        baseline_factor: float = LEAK_BASELINE_FACTOR,
+    ) -> None:
+        """Initialise the detector.
+
+        Arguments:
+            nights (int, optional): The nights in the baseline. Defaults to LEAK_BASELINE_NIGHTS.
+            continuous_hours (int, optional): The hours of unbroken flow that count as a leak. Defaults to LEAK_CONTINUOUS_HOURS.
+            min_night_flow (float, optional): The least minimum night flow, in litres per hour, that can count as a leak. Defaults to LEAK_MIN_NIGHT_FLOW.
+            baseline_factor (float, optional): How far above the baseline a night's minimum must be. Defaults to LEAK_BASELINE_FACTOR.
+
+        """
+        self.continuous_hours: int = continuous_hours
+        self.min_night_flow: float = min_night_flow
+        self.baseline_factor: float = baseline_factor
+        self.nights: deque[float] = deque(maxlen=nights)
+        self._nights_sum: float = 0.0
+        self.last_date: date | None = None
+        self.flow_hours: int = 0
+        self.night_flow: float | None = None
+        self.last_night_flow: float | None = None
+        self.night_leak: bool = False
+
+    @property
+    def baseline(self) -> float | None:
+        """Return the average minimum night flow of recent nights.
+
+        Returns:
+            float | None: Litres per hour, or None before a night has been seen
+
+        """
+        return self._nights_sum / len(self.nights) if self.nights else None
+
+    @property
+    def continuous(self) -> bool:
+        """Return whether water has flowed for every hour of the last continuous_hours.
+
+        Returns:
+            bool: True while the flow has not stopped for long enough
+
+        """
+        return self.flow_hours >= self.continuous_hours
+
+    @property
+    def detected(self) -> bool:
+        """Return whether a leak is suspected.
+
+        Returns:
+            bool: True on continuous flow or an unusually high night flow
+
+        """
+        return self.continuous or self.night_leak
+
+    @property
+    def reasons(self) -> list[str]:
+        """Return why a leak is suspected.
+
+        Returns:
+            list[str]: The signals that are raised, empty when no leak is suspected
+
+        """
+        reasons = []
+        if self.continuous:
+            reasons.append(LEAK_CONTINUOUS)
+        if self.night_leak:
+            reasons.append(LEAK_NIGHT_FLOW)
+        return reasons
+
+    def add_day(self, day_date: date, readings: list[float | None]) -> bool:
+        """Feed the next complete day of readings into the detector.
+
+        Days on or before the last day fed are ignored, so backfills and repeated
+        imports do not disturb the running state.
+
+        Arguments:
+            day_date (date): The local date of the readings
+            readings (list[float | None]): The hourly readings
+
+        Returns:
+            bool: True if a leak started to be suspected during the day
+
+        """
+        if self.last_date is not None and day_date <= self.last_date:
+            return False
+        if self.last_date is not None and (day_date - self.last_date).days > 1:
+            # a gap in the readings breaks any run of flow
+            self.flow_hours = 0
+        self.last_date = day_date
+
+        was_detected = self.detected
+        started = False
+        for hour, litres in enumerate(readings):
+            self.add_reading(hour, litres or 0.0)
+            if self.detected and not was_detected:
+                started = True
+            was_detected = self.detected
+        return started
+
+    def add_reading(self, hour: int, litres: float) -> None:
+        """Feed one hourly reading into the detector.
+
+        Arguments:
+            hour (int): The hour of the day the reading is for
+            litres (float): The litres used in the hour
+
+        """
+        self.flow_hours = self.flow_hours + 1 if litres > 0 else 0
+
+        if hour >= LEAK_NIGHT_END:
+            return
+        if hour == 0 or self.night_flow is None:
+            self.night_flow = litres
+        else:
+            self.night_flow = min(self.night_flow, litres)
+        if hour == LEAK_NIGHT_END - 1:
+            self._end_night(self.night_flow)
+
+    def _end_night(self, night_flow: float) -> None:
+        """Judge a night's minimum flow, then add it to the baseline.
+
+        Arguments:
+            night_flow (float): The least litres used in any night hour
+
+        """
+        baseline = self.baseline
+        self.night_leak = night_flow >= self.min_night_flow and (
+            baseline is None or night_flow > baseline * self.baseline_factor
+        )
+        if len(self.nights) == self.nights.maxlen:
+            self._nights_sum -= self.nights[0]
+        self.nights.append(night_flow)
+        self._nights_sum += night_flow
+        self.last_night_flow = night_flow
+        self.night_flow = None
+
+    def get_attributes(self) -> dict[str, Any]:
+        """Return the detector state for the leak sensor and event.
+
+        Returns:
+            dict[str, Any]: The signals and the values behind them
+
+        """
+        baseline = self.baseline
+        return {
+            "date": self.last_date.isoformat() if self.last_date else None,
+            "reasons": self.reasons,
+            "consecutive_flow_hours": self.flow_hours,
+            "night_flow": self.last_night_flow,
+            "night_flow_baseline": round(baseline, 2) if baseline is not None else None,
+        }
@@ -0,0 +1,168 @@
+"""Rolling fetch and import metrics, kept in memory for diagnostics."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import deque
+from typing import Any
+
+from .const import (
+    METRIC_AURA_LATENCY,
+    METRIC_BYTES_RECEIVED,
+    METRIC_FAILURES,
+    METRIC_LOGIN_TIME,
+    METRIC_QUEUE_WAIT,
+    METRIC_READINGS_PARSED,
+    METRIC_RECORDER_WRITE,
+    METRIC_RETRIES,
+    METRICS_WINDOW,
+)
+
+TIME_BUCKETS = (100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+SIZE_BUCKETS = (1000, 10000, 100000, 1000000)
+COUNT_BUCKETS = (24, 168, 744, 2232, 8784)
+
+HISTOGRAMS = {
+    METRIC_QUEUE_WAIT: TIME_BUCKETS,
+    METRIC_LOGIN_TIME: TIME_BUCKETS,
+    METRIC_AURA_LATENCY: TIME_BUCKETS,
+    METRIC_BYTES_RECEIVED: SIZE_BUCKETS,
+    METRIC_READINGS_PARSED: COUNT_BUCKETS,
+    METRIC_RECORDER_WRITE: TIME_BUCKETS,
+}
+COUNTERS = (METRIC_RETRIES, METRIC_FAILURES)
+
+
+class Histogram:
+    """The most recent samples of a metric, summarised on demand."""
+
+    def __init__(self, buckets: tuple[int, ...], window: int = METRICS_WINDOW) -> None:
+        """Initialise the histogram.
+
+        Arguments:
+            buckets (tuple[int, ...]): The upper bound of each bucket, in order
+            window (int, optional): The number of samples kept. Defaults to METRICS_WINDOW.
+
+        """
+        self.buckets: tuple[int, ...] = buckets
+        self.samples: deque[float] = deque(maxlen=window)
+
+    def add(self, value: float) -> None:
+        """Add a sample, dropping the oldest once the window is full.
+
+        Arguments:
+            value (float): The sample
+
+        """
+        self.samples.append(value)
+
+    def percentile(self, percent: float) -> float | None:
+        """Return a percentile of the samples in the window.
+
+        Arguments:
+            percent (float): The percentile, from 0 to 100
+
+        Returns:
+            float | None: The nearest-rank percentile, or None without samples
+
+        """
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram for diagnostics.
+
+        Returns:
+            dict[str, Any]: The sample count, summary values and bucket counts
+
+        """
+        if not self.samples:
+            return {"count": 0}
+        counts = [0] * (len(self.buckets) + 1)
+        for value in self.samples:
+            counts[bisect_left(self.buckets, value)] += 1
+        labels = [f"<={bound}" for bound in self.buckets] + [f">{self.buckets[-1]}"]
+        return {
+            "count": len(self.samples),
+            "last": self.samples[-1],
+            "min": min(self.samples),
+            "max": max(self.samples),
+            "mean": round(sum(self.samples) / len(self.samples), 1),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "buckets": dict(zip(labels, counts, strict=True)),
+        }
+
+
+class FetchMetrics:
+    """Rolling histograms and counters for the fetches and imports of one config entry."""
+
+    def __init__(self) -> None:
+        """Initialise empty metrics."""
+        self.histograms: dict[str, Histogram] = {
+            name: Histogram(buckets) for name, buckets in HISTOGRAMS.items()
+        }
+        self.counters: dict[str, int] = dict.fromkeys(COUNTERS, 0)
+
+    def record(self, name: str, value: float) -> None:
+        """Add a sample to a histogram.
+
+        Arguments:
+            name (str): The metric name
+            value (float): The sample
+
+        """
+        self.histograms[name].add(value)
+
+    def increment(self, name: str) -> None:
+        """Add one to a counter.
+
+        Arguments:
+            name (str): The metric name
+
+        """
+        self.counters[name] += 1
+
+    def get_value(self, name: str) -> float | int | None:
+        """Return the value shown by a metric's sensor.
+
+        Arguments:
+            name (str): The metric name
+
+        Returns:
+            float | int | None: The median of a histogram, the total of a counter, or None without samples
+
+        """
+        if name in self.counters:
+            return self.counters[name]
+        return self.histograms[name].percentile(50)
+
+    def get_attributes(self, name: str) -> dict[str, Any]:
+        """Return the sensor attributes of a metric.
+
+        Arguments:
+            name (str): The metric name
+
+        Returns:
+            dict[str, Any]: The histogram summary, or nothing for a counter
+
+        """
+        if name in self.counters:
+            return {}
+        return self.histograms[name].as_dict()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return every metric for diagnostics.
+
+        Returns:
+            dict[str, Any]: The histograms and counters
+
+        """
+        return {
+            **{
+                name: histogram.as_dict() for name, histogram in self.histograms.items()
+            },
+            **self.counters,
+        }
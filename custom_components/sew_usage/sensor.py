@@ -2,10 +2,10 @@
 
 from __future__ import annotations
 
-from datetime import datetime as dt, timedelta
-from enum import Enum
 import logging
 import traceback
+from datetime import datetime as dt
+from enum import Enum
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -20,6 +20,10 @@ from homeassistant.const import (
     ATTR_MODEL,
     ATTR_NAME,
     ATTR_SW_VERSION,
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfInformation,
+    UnitOfTime,
     UnitOfVolume,
 )
 from homeassistant.core import HomeAssistant, callback
@@ -34,8 +38,21 @@ from .const import (
     ATTRIBUTION,
     DOMAIN,
     MANUFACTURER,
-    SCAN_INTERVAL,
+    METRIC_AURA_LATENCY,
+    METRIC_BYTES_RECEIVED,
+    METRIC_FAILURES,
+    METRIC_LOGIN_TIME,
+    METRIC_QUEUE_WAIT,
+    METRIC_READINGS_PARSED,
+    METRIC_RECORDER_WRITE,
+    METRIC_RETRIES,
+    SENSOR_AVERAGE_MONTH,
+    SENSOR_AVERAGE_WEEK,
+    SENSOR_BACKFILL,
+    SENSOR_DAILY_USAGE,
+    SENSOR_HOUR_PROFILE,
     SENSOR_MAINS,
+    SENSOR_PEAK_HOUR,
     SENSOR_RECYCLED,
 )
 from .coordinator import SEWDataUpdateCoordinator
@@ -52,7 +69,7 @@ SENSORS: dict[str, SensorEntityDescription] = {
         icon="mdi:water",
         native_unit_of_measurement=UnitOfVolume.LITERS,
         device_class=SensorDeviceClass.WATER,
-        state_class=SensorStateClass.TOTAL_INCREASING,
+        # no state class: the imported hourly statistics are the only ones kept
         suggested_display_precision=1,
         suggested_unit_of_measurement=UnitOfVolume.LITERS,
     ),
@@ -64,13 +81,143 @@ SENSORS: dict[str, SensorEntityDescription] = {
         icon="mdi:water-opacity",
         native_unit_of_measurement=UnitOfVolume.LITERS,
         device_class=SensorDeviceClass.WATER,
-        state_class=SensorStateClass.TOTAL_INCREASING,
+        # no state class: the imported hourly statistics are the only ones kept
         suggested_display_precision=1,
         suggested_unit_of_measurement=UnitOfVolume.LITERS,
     ),
+    SENSOR_BACKFILL: SensorEntityDescription(
+        key=SENSOR_BACKFILL,
+        translation_key="backfill_progress",
+        name="Backfill Progress",
+        icon="mdi:progress-download",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+    ),
+    SENSOR_DAILY_USAGE: SensorEntityDescription(
+        key=SENSOR_DAILY_USAGE,
+        translation_key="daily_usage",
+        name="Daily Usage",
+        icon="mdi:water-outline",
+        native_unit_of_measurement=UnitOfVolume.LITERS,
+        device_class=SensorDeviceClass.WATER,
+        suggested_display_precision=1,
+    ),
+    SENSOR_AVERAGE_WEEK: SensorEntityDescription(
+        key=SENSOR_AVERAGE_WEEK,
+        translation_key="average_daily_usage_week",
+        name="Average Daily Usage (7 Days)",
+        icon="mdi:chart-line",
+        native_unit_of_measurement=UnitOfVolume.LITERS,
+        device_class=SensorDeviceClass.WATER,
+        suggested_display_precision=1,
+    ),
+    SENSOR_AVERAGE_MONTH: SensorEntityDescription(
+        key=SENSOR_AVERAGE_MONTH,
+        translation_key="average_daily_usage_month",
+        name="Average Daily Usage (30 Days)",
+        icon="mdi:chart-line",
+        native_unit_of_measurement=UnitOfVolume.LITERS,
+        device_class=SensorDeviceClass.WATER,
+        suggested_display_precision=1,
+    ),
+    SENSOR_PEAK_HOUR: SensorEntityDescription(
+        key=SENSOR_PEAK_HOUR,
+        translation_key="peak_hour_usage",
+        name="Peak Hour Usage",
+        icon="mdi:water-alert-outline",
+        native_unit_of_measurement=UnitOfVolume.LITERS,
+        device_class=SensorDeviceClass.WATER,
+        suggested_display_precision=1,
+    ),
+    SENSOR_HOUR_PROFILE: SensorEntityDescription(
+        key=SENSOR_HOUR_PROFILE,
+        translation_key="hourly_usage_profile",
+        name="Busiest Hour",
+        icon="mdi:clock-outline",
+    ),
+    METRIC_QUEUE_WAIT: SensorEntityDescription(
+        key=METRIC_QUEUE_WAIT,
+        name="Browserless Queue Wait",
+        icon="mdi:timer-sand",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    METRIC_LOGIN_TIME: SensorEntityDescription(
+        key=METRIC_LOGIN_TIME,
+        name="Login Time",
+        icon="mdi:login",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    METRIC_AURA_LATENCY: SensorEntityDescription(
+        key=METRIC_AURA_LATENCY,
+        name="Usage Request Latency",
+        icon="mdi:timer-outline",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    METRIC_BYTES_RECEIVED: SensorEntityDescription(
+        key=METRIC_BYTES_RECEIVED,
+        name="Bytes Received",
+        icon="mdi:download-network",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    METRIC_READINGS_PARSED: SensorEntityDescription(
+        key=METRIC_READINGS_PARSED,
+        name="Readings Parsed",
+        icon="mdi:counter",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    METRIC_RECORDER_WRITE: SensorEntityDescription(
+        key=METRIC_RECORDER_WRITE,
+        name="Recorder Write Time",
+        icon="mdi:database-clock",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    METRIC_RETRIES: SensorEntityDescription(
+        key=METRIC_RETRIES,
+        name="Fetch Retries",
+        icon="mdi:restart",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    METRIC_FAILURES: SensorEntityDescription(
+        key=METRIC_FAILURES,
+        name="Fetch Failures",
+        icon="mdi:alert-circle-outline",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
 }
 
-SCAN_INTERVAL = timedelta(minutes=SCAN_INTERVAL)
+METRIC_SENSORS = (
+    METRIC_QUEUE_WAIT,
+    METRIC_LOGIN_TIME,
+    METRIC_AURA_LATENCY,
+    METRIC_BYTES_RECEIVED,
+    METRIC_READINGS_PARSED,
+    METRIC_RECORDER_WRITE,
+    METRIC_RETRIES,
+    METRIC_FAILURES,
+)
+
+AGGREGATE_SENSORS = (
+    SENSOR_DAILY_USAGE,
+    SENSOR_AVERAGE_WEEK,
+    SENSOR_AVERAGE_MONTH,
+    SENSOR_PEAK_HOUR,
+    SENSOR_HOUR_PROFILE,
+)
 
 
 async def async_setup_entry(
@@ -90,8 +237,17 @@ async def async_setup_entry(
     coordinator: SEWDataUpdateCoordinator = data.coordinator
     entities = []
 
-    for sensor_types in SENSORS:
-        sen = SEWQualitySensor(coordinator, SENSORS[sensor_types], entry)
+    for sensor_types, description in SENSORS.items():
+        if sensor_types == SENSOR_BACKFILL:
+            entities.append(SEWBackfillSensor(coordinator, description, entry))
+            continue
+        if sensor_types in AGGREGATE_SENSORS:
+            entities.append(SEWAggregateSensor(coordinator, description, entry))
+            continue
+        if sensor_types in METRIC_SENSORS:
+            entities.append(SEWMetricSensor(coordinator, description, entry))
+            continue
+        sen = SEWUsageSensor(coordinator, description, entry)
         if sen.translation_key == "water_usage_recycled":
             if coordinator.collector.get_recycled_water_serial() is not None:
                 entities.append(sen)
@@ -177,7 +333,7 @@ class SEWQualitySensor(CoordinatorEntity[SEWDataUpdateCoordinator], SensorEntity
             ATTR_CONFIGURATION_URL: "https://portal.api.SEW.vic.gov.au/",
         }
 
-        self._unique_id = f"SEW_api_{entity_description.name}"
+        self._unique_id = f"SEW_api_{entry.entry_id}_{entity_description.name}"
 
     @callback
     def _handle_coordinator_update(self):
@@ -203,10 +359,6 @@ class SEWQualitySensor(CoordinatorEntity[SEWDataUpdateCoordinator], SensorEntity
 
         self.async_write_ha_state()
 
-    async def async_update(self):
-        """Refresh the data on the collector object."""
-        await self._collector.async_update()
-
     @property
     def name(self):
         """Return the name of the device.
@@ -263,9 +415,55 @@ class SEWQualitySensor(CoordinatorEntity[SEWDataUpdateCoordinator], SensorEntity
 
         return self.native_value
 
-    async def async_added_to_hass(self):
-        """Call when an entity is added to hass."""
-        await super().async_added_to_hass()
-        self.async_on_remove(
-            self._coordinator.async_add_listener(self._handle_coordinator_update)
+
+class SEWUsageSensor(SEWQualitySensor):
+    """Running total of a water meter, kept by the coordinator as usage is imported."""
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Handle updated data from the coordinator, including the last imported hour."""
+        last_hour = self._coordinator.get_last_hour(self.entity_id)
+        self._attr_extra_state_attributes = {
+            "last_imported_hour": last_hour.isoformat() if last_hour else None
+        }
+        super()._handle_coordinator_update()
+
+
+class SEWBackfillSensor(SEWQualitySensor):
+    """Progress of the backfill of days missing from statistics."""
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Handle updated data from the coordinator, including the backfill details."""
+        self._attr_extra_state_attributes = self._coordinator.backfill.as_dict()
+        super()._handle_coordinator_update()
+
+
+class SEWMetricSensor(SEWQualitySensor):
+    """A fetch or import metric, the median of its rolling window or a running count."""
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Handle updated data from the coordinator, reading the collector's metrics."""
+        metrics = self._collector.metrics
+        self._sensor_data = metrics.get_value(self.entity_description.key)
+        self._attr_extra_state_attributes = metrics.get_attributes(
+            self.entity_description.key
+        )
+        self._attr_available = self._sensor_data is not None
+        self.async_write_ha_state()
+
+
+class SEWAggregateSensor(SEWQualitySensor):
+    """A rolling aggregate of mains usage, updated as each day is imported."""
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Handle updated data from the coordinator, reading the coordinator's aggregates."""
+        aggregates = self._coordinator.aggregates
+        self._sensor_data = aggregates.get_value(self.entity_description.key)
+        self._attr_extra_state_attributes = aggregates.get_attributes(
+            self.entity_description.key
         )
+        self._attr_available = self._sensor_data is not None
+        self.async_write_ha_state()
@@ -0,0 +1,192 @@
+"""Compact hourly usage series with DST-aware hour start times."""
+
+from __future__ import annotations
+
+import math
+from array import array
+from collections.abc import Iterable, Iterator
+from datetime import date, time, timedelta, tzinfo
+from datetime import datetime as dt
+from functools import lru_cache
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+HOURS_PER_DAY = 24
+HOUR_OFFSETS: tuple[int, ...] = tuple(hour * 3600 for hour in range(HOURS_PER_DAY))
+
+
+def get_day_start(day_date: date, time_zone: tzinfo) -> float:
+    """Return the UTC timestamp of local midnight.
+
+    Arguments:
+        day_date (date): The local date
+        time_zone (tzinfo): The local time zone
+
+    Returns:
+        float: The timestamp of the start of the day
+
+    """
+    return dt.combine(day_date, time(), tzinfo=time_zone).timestamp()
+
+
+@lru_cache(maxsize=64)
+def get_hour_offsets(day_date: date, time_zone: tzinfo) -> tuple[int, ...]:
+    """Return the seconds from local midnight to the start of each wall clock hour.
+
+    SEW reports 24 readings a day by wall clock hour. On days without a DST change
+    that is the shared HOUR_OFFSETS table. When clocks go forward, the missing hour
+    shares the start of the hour after it, so its reading is added to that hour.
+    When clocks go back, the repeated hour starts at its first occurrence.
+
+    Arguments:
+        day_date (date): The local date
+        time_zone (tzinfo): The local time zone
+
+    Returns:
+        tuple[int, ...]: The offset in seconds of each of the 24 readings, never decreasing
+
+    """
+    midnight = dt.combine(day_date, time(), tzinfo=time_zone)
+    next_midnight = dt.combine(day_date + timedelta(days=1), time(), tzinfo=time_zone)
+    if midnight.utcoffset() == next_midnight.utcoffset():
+        return HOUR_OFFSETS
+
+    base = midnight.timestamp()
+    offsets: list[int] = []
+    for hour in range(HOURS_PER_DAY):
+        start = dt.combine(day_date, time(hour), tzinfo=time_zone)
+        if (
+            dt_util.utc_from_timestamp(start.timestamp()).astimezone(time_zone).hour
+            != hour
+        ):
+            # the hour does not exist today, so use the start of the next hour
+            start = dt.combine(day_date, time(hour + 1), tzinfo=time_zone)
+        offsets.append(int(start.timestamp() - base))
+    return tuple(offsets)
+
+
+def get_hour_amounts(
+    day_date: date, readings: Iterable[float | None], time_zone: tzinfo | None = None
+) -> dict[float, float]:
+    """Return the litres used in each hour of a day that has a reading.
+
+    Arguments:
+        day_date (date): The local date of the readings
+        readings (Iterable[float | None]): The hourly readings, None where SEW had no reading
+        time_zone (tzinfo, optional): The local time zone. Defaults to the Home Assistant time zone.
+
+    Returns:
+        dict[float, float]: The litres used, keyed by the UTC timestamp of the hour start
+
+    """
+    time_zone = time_zone or dt_util.DEFAULT_TIME_ZONE
+    base = get_day_start(day_date, time_zone)
+    amounts: dict[float, float] = {}
+    for offset, litres in zip(get_hour_offsets(day_date, time_zone), readings):
+        if litres is None or math.isnan(litres):
+            continue
+        amounts[base + offset] = amounts.get(base + offset, 0.0) + litres
+    return amounts
+
+
+class UsageSeries:
+    """Hourly readings for a run of days, held as flat arrays of doubles.
+
+    Each day keeps one base timestamp and 24 readings, with NaN where SEW had no
+    reading. Hour start times come from the shared offset tables, so no datetime
+    is built until the readings are walked.
+    """
+
+    def __init__(self, time_zone: tzinfo | None = None) -> None:
+        """Initialise an empty series.
+
+        Arguments:
+            time_zone (tzinfo, optional): The local time zone. Defaults to the Home Assistant time zone.
+
+        """
+        self.time_zone: tzinfo = time_zone or dt_util.DEFAULT_TIME_ZONE
+        self.dates: list[date] = []
+        self.bases: array = array("d")
+        self.readings: array = array("d")
+
+    @classmethod
+    def from_days(
+        cls, days: Iterable[dict[str, Any]], time_zone: tzinfo | None = None
+    ) -> UsageSeries:
+        """Decode days of usage returned by SEW into a series.
+
+        Arguments:
+            days (Iterable[dict[str, Any]]): Days of usage returned by SEW, in date order
+            time_zone (tzinfo, optional): The local time zone. Defaults to the Home Assistant time zone.
+
+        Returns:
+            UsageSeries: The decoded series
+
+        """
+        series = cls(time_zone)
+        for day in days:
+            series.add_day(date.fromisoformat(day["apiDate"][:10]), day["readings"])
+        return series
+
+    def __len__(self) -> int:
+        """Return the number of days in the series.
+
+        Returns:
+            int: The number of days
+
+        """
+        return len(self.dates)
+
+    def add_day(self, day_date: date, readings: Iterable[float | None]) -> None:
+        """Append a day of readings.
+
+        Arguments:
+            day_date (date): The local date of the readings
+            readings (Iterable[float | None]): The hourly readings, None where SEW had no reading
+
+        """
+        start = len(self.readings)
+        self.readings.extend(
+            math.nan if reading is None else reading for reading in readings
+        )
+        # pad or trim to exactly one reading per wall clock hour
+        count = len(self.readings) - start
+        if count < HOURS_PER_DAY:
+            self.readings.extend([math.nan] * (HOURS_PER_DAY - count))
+        elif count > HOURS_PER_DAY:
+            del self.readings[start + HOURS_PER_DAY :]
+        self.dates.append(day_date)
+        self.bases.append(get_day_start(day_date, self.time_zone))
+
+    def iter_hours(self, starting_point: float) -> Iterator[tuple[float, float]]:
+        """Walk the readings as a running total per hour.
+
+        Readings that share an hour start, on days the clocks go forward, are
+        combined into one hour.
+
+        Arguments:
+            starting_point (float): The total the first reading is added to
+
+        Yields:
+            tuple[float, float]: The UTC timestamp of each hour start and the total at the end of it
+
+        """
+        tally = starting_point
+        pending: float | None = None
+        readings = self.readings
+        for index, day_date in enumerate(self.dates):
+            base = self.bases[index]
+            offsets = get_hour_offsets(day_date, self.time_zone)
+            first = index * HOURS_PER_DAY
+            for hour, offset in enumerate(offsets):
+                litres = readings[first + hour]
+                if math.isnan(litres):  # no reading for this hour
+                    continue
+                start = base + offset
+                if pending is not None and start != pending:
+                    yield pending, tally
+                tally += litres
+                pending = start
+        if pending is not None:
+            yield pending, tally
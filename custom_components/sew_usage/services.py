@@ -0,0 +1,150 @@
+"""Services for South East Water Usage."""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, timedelta
+
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .backfill import BACKFILL_RUNNING
+from .const import (
+    DATE_FROM,
+    DATE_TO,
+    DOMAIN,
+    SERVICE_BACKFILL,
+    SERVICE_IMPORT_WATER_USAGE,
+    STAT_ID,
+)
+from .data import SEWConfigEntry
+
+_LOGGER = logging.getLogger(__name__)
+
+CONFIG_ENTRY_ID = "config_entry_id"
+
+IMPORT_WATER_USAGE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(DATE_FROM): cv.date,
+        vol.Optional(DATE_TO): cv.date,
+        vol.Optional(STAT_ID): cv.entity_id,
+    }
+)
+
+BACKFILL_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(DATE_FROM): cv.date,
+        vol.Optional(DATE_TO): cv.date,
+    }
+)
+
+
+def get_entries(hass: HomeAssistant, call: ServiceCall) -> list[SEWConfigEntry]:
+    """Return the loaded config entries a service call applies to.
+
+    Arguments:
+        hass (HomeAssistant): The Home Assistant instance.
+        call (ServiceCall): The service call
+
+    Raises:
+        ServiceValidationError: When no loaded entry matches the call
+
+    Returns:
+        list[SEWConfigEntry]: The matching loaded entries
+
+    """
+    entries = [
+        entry
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.state is ConfigEntryState.LOADED
+        and call.data.get(CONFIG_ENTRY_ID, entry.entry_id) == entry.entry_id
+    ]
+    if not entries:
+        raise ServiceValidationError("No loaded South East Water Usage entry found")
+    return entries
+
+
+async def async_import_water_usage(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Fetch usage for a range of dates and import it into statistics.
+
+    Arguments:
+        hass (HomeAssistant): The Home Assistant instance.
+        call (ServiceCall): The service call
+
+    Raises:
+        HomeAssistantError: When the usage could not be retrieved from browserless
+
+    """
+    date_to: date = call.data.get(DATE_TO, dt_util.now().date() - timedelta(days=1))
+    date_from: date = call.data.get(DATE_FROM, date_to)
+    if date_from > date_to:
+        raise ServiceValidationError(f"{DATE_FROM} must not be after {DATE_TO}")
+
+    for entry in get_entries(hass, call):
+        try:
+            await entry.runtime_data.coordinator.async_import_usage(
+                date_from, date_to, call.data.get(STAT_ID)
+            )
+        except Exception as ex:
+            raise HomeAssistantError(
+                f"Unable to retrieve water usage from {date_from} to {date_to}: {ex}"
+            ) from ex
+
+
+async def async_backfill(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Start a backfill of every day missing from statistics in the background.
+
+    Arguments:
+        hass (HomeAssistant): The Home Assistant instance.
+        call (ServiceCall): The service call
+
+    Raises:
+        ServiceValidationError: When a backfill is already running
+
+    """
+    for entry in get_entries(hass, call):
+        coordinator = entry.runtime_data.coordinator
+        if coordinator.backfill.state == BACKFILL_RUNNING:
+            raise ServiceValidationError("A backfill is already running")
+
+        entry.async_create_background_task(
+            hass,
+            coordinator.async_backfill(
+                call.data.get(DATE_FROM), call.data.get(DATE_TO)
+            ),
+            f"{DOMAIN} backfill {entry.entry_id}",
+        )
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services.
+
+    Arguments:
+        hass (HomeAssistant): The Home Assistant instance.
+
+    """
+
+    async def import_water_usage(call: ServiceCall) -> None:
+        await async_import_water_usage(hass, call)
+
+    async def backfill(call: ServiceCall) -> None:
+        await async_backfill(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_WATER_USAGE,
+        import_water_usage,
+        schema=IMPORT_WATER_USAGE_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BACKFILL,
+        backfill,
+        schema=BACKFILL_SCHEMA,
+    )
@@ -0,0 +1,149 @@
+"""Persisted SEW portal sessions, so that fetches can skip the login."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from dataclasses import asdict, dataclass, field
+from datetime import datetime as dt
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    AURA_APP_LOADED,
+    AURA_FWUID,
+    DOMAIN,
+    SESSION_LIFETIME,
+    STORAGE_VERSION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class SEWSession:
+    """The cookies, aura token and account ids of a logged in SEW session."""
+
+    cookies: dict[str, str]
+    aura_token: str
+    account_num: str
+    meter_serial: str
+    expires: float = field(default=0.0)
+    fwuid: str = field(default=AURA_FWUID)
+    loaded: str = field(default=AURA_APP_LOADED)
+
+    @staticmethod
+    def get_expiry(cookies: list[dict[str, Any]] | None = None) -> float:
+        """Return when a new session expires.
+
+        Arguments:
+            cookies (list[dict[str, Any]], optional): Cookies with an expires timestamp. Defaults to None.
+
+        Returns:
+            float: The earliest cookie expiry, or SESSION_LIFETIME minutes from now
+
+        """
+        expires = (dt_util.utcnow() + timedelta(minutes=SESSION_LIFETIME)).timestamp()
+        for cookie in cookies or []:
+            if cookie.get("expires", -1) > 0:
+                expires = min(expires, cookie["expires"])
+        return expires
+
+    @classmethod
+    def from_scraper(cls, data: dict[str, Any]) -> SEWSession:
+        """Create a session from the session returned by the browserless scraper.
+
+        The session expires at the earliest cookie expiry, or SESSION_LIFETIME minutes from now.
+
+        Arguments:
+            data (dict[str, Any]): The session returned by the scraper
+
+        Returns:
+            SEWSession: The session
+
+        """
+        return cls(
+            cookies={
+                cookie["name"]: cookie["value"] for cookie in data.get("cookies", [])
+            },
+            aura_token=data.get("aura_token") or "",
+            account_num=data.get("account_num") or "",
+            meter_serial=data.get("meter_serial") or "",
+            expires=cls.get_expiry(data.get("cookies")),
+        )
+
+    @property
+    def valid(self) -> bool:
+        """Return whether the session can still be used.
+
+        Returns:
+            bool: True if the session has a token and has not expired
+
+        """
+        return (
+            self.aura_token != ""
+            and self.account_num != ""
+            and dt_util.utcnow().timestamp() < self.expires
+        )
+
+
+class SessionStore:
+    """Keeps the SEW session for one account in Home Assistant storage."""
+
+    def __init__(self, hass: HomeAssistant, sew_username: str) -> None:
+        """Initialise the store.
+
+        Arguments:
+            hass (HomeAssistant): The Home Assistant instance.
+            sew_username (str): The SEW username the session belongs to.
+
+        """
+        account = hashlib.sha256(sew_username.lower().encode()).hexdigest()[:16]
+        self._store: Store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.session.{account}", private=True
+        )
+        self._session: SEWSession | None = None
+        self._loaded: bool = False
+
+    async def async_get(self) -> SEWSession | None:
+        """Return the saved session if it has not expired.
+
+        Returns:
+            SEWSession | None: The saved session, or None
+
+        """
+        if not self._loaded:
+            self._loaded = True
+            if stored := await self._store.async_load():
+                try:
+                    self._session = SEWSession(**stored)
+                except TypeError:
+                    _LOGGER.debug("Discarding unreadable saved session")
+
+        if self._session is not None and self._session.valid:
+            return self._session
+        return None
+
+    async def async_save(self, session: SEWSession) -> None:
+        """Save a new session.
+
+        Arguments:
+            session (SEWSession): The session to save
+
+        """
+        self._session = session
+        self._loaded = True
+        await self._store.async_save(asdict(session))
+        _LOGGER.debug(
+            "Saved SEW session valid until %s", dt.fromtimestamp(session.expires)
+        )
+
+    async def async_invalidate(self) -> None:
+        """Forget the saved session after the portal has rejected it."""
+        self._session = None
+        self._loaded = True
+        await self._store.async_remove()
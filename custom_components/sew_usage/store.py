@@ -0,0 +1,366 @@
+"""Local store of the hourly readings already downloaded from SEW."""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import logging
+import math
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, STORAGE_VERSION
+
+_LOGGER = logging.getLogger(__name__)
+
+SAVE_DELAY = 10
+READINGS = "readings"
+IMPORTED = "imported"
+REPLACED = "replaced"
+
+
+def get_revision(readings: array) -> str:
+    """Return the revision of a day of readings.
+
+    Arguments:
+        readings (array): The hourly readings, NaN where SEW had no reading
+
+    Returns:
+        str: A hash of the readings, which changes when any hour appears or changes
+
+    """
+    return hashlib.blake2b(readings.tobytes(), digest_size=8).hexdigest()
+
+
+def encode_readings(readings: array) -> str:
+    """Encode a day of readings for storage.
+
+    Arguments:
+        readings (array): The hourly readings, NaN where SEW had no reading
+
+    Returns:
+        str: The readings as base64 encoded doubles
+
+    """
+    return base64.b64encode(readings.tobytes()).decode()
+
+
+def decode_readings(encoded: str) -> array:
+    """Decode a day of readings from storage.
+
+    Arguments:
+        encoded (str): The readings as base64 encoded doubles
+
+    Returns:
+        array: The hourly readings, NaN where SEW had no reading
+
+    """
+    readings = array("d")
+    readings.frombytes(base64.b64decode(encoded))
+    return readings
+
+
+def encode_days(meters: dict[str, dict[date, array]]) -> dict[str, dict[str, str]]:
+    """Encode days of readings per meter for storage.
+
+    Arguments:
+        meters (dict[str, dict[date, array]]): The readings per meter and date
+
+    Returns:
+        dict[str, dict[str, str]]: The encoded readings per meter and ISO date
+
+    """
+    return {
+        meter: {
+            day.isoformat(): encode_readings(readings) for day, readings in days.items()
+        }
+        for meter, days in meters.items()
+    }
+
+
+def decode_days(meters: dict[str, dict[str, str]]) -> dict[str, dict[date, array]]:
+    """Decode days of readings per meter from storage.
+
+    Arguments:
+        meters (dict[str, dict[str, str]]): The encoded readings per meter and ISO date
+
+    Returns:
+        dict[str, dict[date, array]]: The readings per meter and date
+
+    """
+    return {
+        meter: {
+            date.fromisoformat(day): decode_readings(readings)
+            for day, readings in days.items()
+        }
+        for meter, days in meters.items()
+    }
+
+
+class ReadingStore:
+    """Hourly readings per meter and day, held as one array of doubles per day.
+
+    Each meter keeps a sorted index of the dates it holds, so ranges and gaps are
+    found without scanning every day. The revision of each day last imported to
+    statistics is kept too, along with the imported readings of any day fetched
+    again since, so a later import can write only the hours that changed, even
+    after a restart.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialise the store.
+
+        Arguments:
+            hass (HomeAssistant): The Home Assistant instance.
+            entry_id (str): The config entry the readings belong to.
+
+        """
+        self._store: Store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.readings.{entry_id}"
+        )
+        self._days: dict[str, dict[date, array]] = {}
+        self._index: dict[str, list[date]] = {}
+        self._imported: dict[str, dict[date, str]] = {}
+        self._replaced: dict[str, dict[date, array]] = {}
+
+    async def async_load(self) -> None:
+        """Load the stored readings, the revisions imported to statistics and the readings they replaced."""
+        stored = await self._store.async_load() or {}
+        if READINGS not in stored:
+            # readings stored before revisions were kept were imported as they arrived
+            stored = {READINGS: stored, IMPORTED: None}
+        self._days = decode_days(stored[READINGS])
+        self._index = {meter: sorted(days) for meter, days in self._days.items()}
+        self._replaced = decode_days(stored.get(REPLACED) or {})
+        if stored[IMPORTED] is None:
+            self._imported = {
+                meter: {day: get_revision(readings) for day, readings in days.items()}
+                for meter, days in self._days.items()
+            }
+        else:
+            self._imported = {
+                meter: {
+                    date.fromisoformat(day): revision for day, revision in days.items()
+                }
+                for meter, days in stored[IMPORTED].items()
+            }
+        _LOGGER.debug(
+            "Loaded stored readings for %s",
+            {meter: len(index) for meter, index in self._index.items()},
+        )
+
+    def _data_to_save(self) -> dict[str, dict[str, dict[str, str]]]:
+        """Return the readings, imported revisions and replaced readings in their storage format.
+
+        Returns:
+            dict[str, dict[str, dict[str, str]]]: Encoded readings, imported revisions and replaced readings per meter and ISO date
+
+        """
+        return {
+            READINGS: encode_days(self._days),
+            IMPORTED: {
+                meter: {day.isoformat(): revision for day, revision in days.items()}
+                for meter, days in self._imported.items()
+            },
+            REPLACED: encode_days(self._replaced),
+        }
+
+    def add_days(self, meter: str, days: list[dict[str, Any]]) -> None:
+        """Add days of usage returned by SEW, replacing any stored copy of those days.
+
+        Arguments:
+            meter (str): The meter serial
+            days (list[dict[str, Any]]): Days of usage returned by SEW
+
+        """
+        meter_days = self._days.setdefault(meter, {})
+        index = self._index.setdefault(meter, [])
+        imported = self._imported.get(meter, {})
+        replaced = self._replaced.setdefault(meter, {})
+        for day in days:
+            day_date = date.fromisoformat(day["apiDate"][:10])
+            readings = array(
+                "d", (math.nan if r is None else r for r in day["readings"])
+            )
+            if (stored := meter_days.get(day_date)) is None:
+                insort(index, day_date)
+            elif (
+                day_date not in replaced
+                and imported.get(day_date) == (revision := get_revision(stored))
+                and revision != get_revision(readings)
+            ):
+                # keep what statistics hold until the new readings are imported
+                replaced[day_date] = stored
+            meter_days[day_date] = readings
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def get_revision(self, meter: str, day_date: date) -> str | None:
+        """Return the revision of a stored day.
+
+        Arguments:
+            meter (str): The meter serial
+            day_date (date): The date
+
+        Returns:
+            str | None: The revision, or None if the day is not stored
+
+        """
+        readings = self._days.get(meter, {}).get(day_date)
+        return get_revision(readings) if readings is not None else None
+
+    def get_imported_revision(self, meter: str, day_date: date) -> str | None:
+        """Return the revision of a day last imported to statistics.
+
+        Arguments:
+            meter (str): The meter serial
+            day_date (date): The date
+
+        Returns:
+            str | None: The revision, or None if the day has not been imported
+
+        """
+        return self._imported.get(meter, {}).get(day_date)
+
+    def get_imported_day(self, meter: str, day_date: date) -> dict[str, Any] | None:
+        """Return the readings of a day as last imported to statistics.
+
+        Arguments:
+            meter (str): The meter serial
+            day_date (date): The date
+
+        Returns:
+            dict[str, Any] | None: The day of usage, or None if the imported readings are not known
+
+        """
+        if (readings := self._replaced.get(meter, {}).get(day_date)) is None:
+            readings = self._days.get(meter, {}).get(day_date)
+            if readings is None or self.get_imported_revision(
+                meter, day_date
+            ) != get_revision(readings):
+                return None
+        return {
+            "apiDate": f"{day_date.isoformat()}T00:00:00+00:00",
+            "readings": [None if math.isnan(r) else r for r in readings],
+        }
+
+    def mark_imported(self, meter: str, dates: list[date]) -> None:
+        """Record that the stored readings of some days are now in statistics.
+
+        Arguments:
+            meter (str): The meter serial
+            dates (list[date]): The dates imported
+
+        """
+        imported = self._imported.setdefault(meter, {})
+        replaced = self._replaced.get(meter, {})
+        for day_date in dates:
+            if (readings := self._days.get(meter, {}).get(day_date)) is not None:
+                imported[day_date] = get_revision(readings)
+                replaced.pop(day_date, None)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def get_day(self, meter: str, day_date: date) -> dict[str, Any] | None:
+        """Return a stored day in the format SEW returns it.
+
+        Arguments:
+            meter (str): The meter serial
+            day_date (date): The date
+
+        Returns:
+            dict[str, Any] | None: The day of usage, or None if it is not stored
+
+        """
+        readings = self._days.get(meter, {}).get(day_date)
+        if readings is None:
+            return None
+        return {
+            "apiDate": f"{day_date.isoformat()}T00:00:00+00:00",
+            "readings": [None if math.isnan(r) else r for r in readings],
+        }
+
+    def is_complete(self, meter: str, day_date: date) -> bool:
+        """Return whether every hour of a day is stored.
+
+        Arguments:
+            meter (str): The meter serial
+            day_date (date): The date
+
+        Returns:
+            bool: True if the day is stored without gaps
+
+        """
+        readings = self._days.get(meter, {}).get(day_date)
+        return bool(readings) and not any(math.isnan(r) for r in readings)
+
+    def get_days(
+        self, meter: str, date_from: date, date_to: date
+    ) -> list[dict[str, Any]]:
+        """Return the stored days in a range, in date order.
+
+        Arguments:
+            meter (str): The meter serial
+            date_from (date): The first date
+            date_to (date): The last date
+
+        Returns:
+            list[dict[str, Any]]: The stored days of usage
+
+        """
+        index = self._index.get(meter, [])
+        return [
+            self.get_day(meter, day_date)
+            for day_date in index[
+                bisect_left(index, date_from) : bisect_right(index, date_to)
+            ]
+        ]
+
+    def missing_dates(self, meter: str, date_from: date, date_to: date) -> list[date]:
+        """Return the dates in a range that are not stored complete.
+
+        Arguments:
+            meter (str): The meter serial
+            date_from (date): The first date
+            date_to (date): The last date
+
+        Returns:
+            list[date]: The missing or partial dates, in order
+
+        """
+        missing = []
+        day_date = date_from
+        while day_date <= date_to:
+            if not self.is_complete(meter, day_date):
+                missing.append(day_date)
+            day_date += timedelta(days=1)
+        return missing
+
+    def first_date(self, meter: str) -> date | None:
+        """Return the earliest stored date for a meter.
+
+        Arguments:
+            meter (str): The meter serial
+
+        Returns:
+            date | None: The earliest date, or None if nothing is stored
+
+        """
+        index = self._index.get(meter)
+        return index[0] if index else None
+
+    def last_date(self, meter: str) -> date | None:
+        """Return the latest stored date for a meter.
+
+        Arguments:
+            meter (str): The meter serial
+
+        Returns:
+            date | None: The latest date, or None if nothing is stored
+
+        """
+        index = self._index.get(meter)
+        return index[-1] if index else None
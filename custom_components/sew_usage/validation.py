@@ -0,0 +1,144 @@
+"""Validation of the browserless endpoint and SEW credentials entered in the config flows."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Any
+
+import aiohttp
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .aura import AuraError, LoginFailed
+from .breaker import BudgetExhausted, CircuitOpen, get_breaker, get_retry_budget
+from .browserless import get_browserless_client, get_browserless_url
+from .collector import Collector
+from .const import (
+    BILLING_ACCOUNT_ID,
+    BROWSERLESS,
+    DOMAIN,
+    MAINS_WATER_SERIAL,
+    SEW_URL,
+    TOKEN,
+    VALIDATION_TIMEOUT,
+    VALIDATION_TTL,
+    VALIDATIONS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def get_validation_key(options: dict[str, Any]) -> tuple[str, ...]:
+    """Return the cache key of a set of connection options.
+
+    Arguments:
+        options (dict[str, Any]): The options entered in a config flow
+
+    Returns:
+        tuple[str, ...]: The browserless URL and token, and the credentials with the password hashed
+
+    """
+    return (
+        get_browserless_url(options[BROWSERLESS]),
+        options.get(TOKEN) or "",
+        options[CONF_USERNAME],
+        hashlib.sha256(options[CONF_PASSWORD].encode()).hexdigest(),
+        options.get(BILLING_ACCOUNT_ID) or "",
+        options[MAINS_WATER_SERIAL],
+    )
+
+
+async def async_validate(
+    hass: HomeAssistant, options: dict[str, Any]
+) -> dict[str, str]:
+    """Check that browserless is running and SEW accepts the credentials.
+
+    Each distinct set of options is checked once. Concurrent checks of the same set
+    share one run, and a successful result is reused for VALIDATION_TTL seconds.
+
+    Arguments:
+        hass (HomeAssistant): The Home Assistant instance.
+        options (dict[str, Any]): The options entered in a config flow
+
+    Returns:
+        dict[str, str]: The form errors, empty when the options are valid
+
+    """
+    cache: dict[tuple[str, ...], tuple[float, asyncio.Task]] = hass.data.setdefault(
+        DOMAIN, {}
+    ).setdefault(VALIDATIONS, {})
+    now = time.monotonic()
+    for key in [key for key, (expires, _) in cache.items() if expires < now]:
+        del cache[key]
+
+    key = get_validation_key(options)
+    if key not in cache:
+        cache[key] = (
+            now + VALIDATION_TTL,
+            hass.async_create_task(_async_validate(hass, options)),
+        )
+    else:
+        _LOGGER.debug("Reusing validation of %s", key[0])
+    task = cache[key][1]
+
+    errors = await asyncio.shield(task)
+    if errors and cache.get(key, (0, None))[1] is task:
+        # only successes are cached, so a fix elsewhere is picked up on the next try
+        del cache[key]
+    return errors
+
+
+async def _async_validate(
+    hass: HomeAssistant, options: dict[str, Any]
+) -> dict[str, str]:
+    """Ping browserless, then log in to SEW once.
+
+    Arguments:
+        hass (HomeAssistant): The Home Assistant instance.
+        options (dict[str, Any]): The options entered in a config flow
+
+    Returns:
+        dict[str, str]: The form errors, empty when the options are valid
+
+    """
+    browserless_client = get_browserless_client(
+        hass, options[BROWSERLESS], options.get(TOKEN)
+    )
+    try:
+        if not await browserless_client.async_active(VALIDATION_TIMEOUT):
+            return {"base": "bad_api"}
+    except (aiohttp.ClientError, TimeoutError) as ex:
+        _LOGGER.debug("Browserless check failed: %s", ex)
+        return {"base": "bad_api"}
+
+    collector = Collector(
+        mains_water_serial=options[MAINS_WATER_SERIAL],
+        sew_username=options[CONF_USERNAME],
+        sew_password=options[CONF_PASSWORD],
+        browserless=options[BROWSERLESS],
+        token=options.get(TOKEN) or "",
+        session=async_get_clientsession(hass),
+        billing_account_id=options.get(BILLING_ACCOUNT_ID) or "",
+        browserless_client=browserless_client,
+        portal_breaker=get_breaker(hass, SEW_URL),
+        retry_budget=get_retry_budget(hass, options[CONF_USERNAME]),
+    )
+    try:
+        await collector.async_check_login()
+    except (BudgetExhausted, CircuitOpen) as ex:
+        _LOGGER.debug("SEW login check held back: %s", ex)
+        return {"base": "login_paused"}
+    except LoginFailed as ex:
+        _LOGGER.debug("SEW login rejected: %s", ex)
+        return {"base": "invalid_auth"}
+    except (AuraError, aiohttp.ClientError, TimeoutError) as ex:
+        _LOGGER.debug("SEW login check failed: %s", ex)
+        return {"base": "cannot_connect"}
+    except Exception:
+        _LOGGER.exception("Unexpected exception checking the SEW login")
+        return {"base": "unknown"}
+    return {}
@@ -1,8 +1,11 @@
-from datetime import datetime, timedelta, date  # noqa: D100, INP001
 import json
+import logging
 import os
+import random
+import time
+from datetime import date, datetime, timedelta  # noqa: D100, INP001
 from pathlib import Path
-import logging
+
 import requests
 
 SEW_USERNAME = "sew_username"
@@ -10,12 +13,152 @@ SEW_PASSWORD = "sew_password"
 SEW_BAID = "sew_baid"
 SEW_METERID = "sew_meterid"
 TARGET_DATE = "target_date"
+DATE_FROM = "date_from"
+DATE_TO = "date_to"
 CODE = "code"
 CONTEXT = "context"
 GET_RECYCLED = False
+SCRIPT_PATH = "pyscript/get_target_date_water_usage.js"
+
+# the scraper's modification time and the request body up to its context, rebuilt only when the file changes
+_scraper_cache = {}
+
+# after BREAKER_THRESHOLD failed scraper runs in a row, calls pause with a doubling, jittered backoff
+BREAKER_THRESHOLD = 3
+BREAKER_BASE_DELAY = 900
+BREAKER_MAX_DELAY = 21600
+BREAKER_NOTIFICATION = "sew_water_usage_paused"
+_breaker = {"failures": 0, "trips": 0, "retry_at": 0.0}
+
+# scraper runs allowed per SEW account per day, each of which logs in
+DAILY_LOGIN_BUDGET = 12
+_budget = {}
 
 _LOGGER = logging.getLogger(__name__)
 
+
+@pyscript_executor  # noqa: F821
+def read_script_if_changed(path, cached_mtime):
+    """Read the puppeteer JS file in an executor thread if it has changed.
+
+    fields:
+        path:
+            example: /config/pyscript/get_target_date_water_usage.js
+            required: true
+        cached_mtime:
+            example: modification time of the cached copy, or None
+            required: true
+
+    Returns the file's modification time and its contents, or None if it is unchanged.
+    """
+    mtime = os.stat(path).st_mtime_ns
+    if mtime == cached_mtime:
+        return mtime, None
+    return mtime, Path(path).read_text(encoding="utf-8")
+
+
+def get_scraper_payload(context):
+    """Return the browserless request body for a context.
+
+    fields:
+        context:
+            example: dict of values passed to the puppeteer script
+            required: true
+
+    The script is only re-read and re-encoded when its modification time changes,
+    so each call just encodes the context.
+    """
+    path = f"{hass.config.config_dir}/{SCRIPT_PATH}"  # noqa: F821
+    mtime, code = read_script_if_changed(path, _scraper_cache.get("mtime"))
+    if code is not None:
+        _scraper_cache["mtime"] = mtime
+        _scraper_cache["prefix"] = f'{{"{CODE}": {json.dumps(code)}, "{CONTEXT}": '
+        log.info(f"Loaded scraper script {SCRIPT_PATH}")  # noqa: F821
+
+    return _scraper_cache["prefix"] + json.dumps(context) + "}"
+
+
+def call_scraper(browserless, token, context):
+    """Run the scraper on browserless, guarded by the circuit breaker and daily budget.
+
+    fields:
+        browserless:
+            example: http://localhost:3000
+            required: true
+        token:
+            example: 6R0W53R135510, or blank if running on the HASS addon
+            required: false
+        context:
+            example: dict of values passed to the puppeteer script
+            required: true
+
+    Returns the decoded scraper response. Raises RuntimeError without calling
+    browserless while the breaker is open or today's logins are used up, and
+    when SEW rejects the username or password. A rejected login shows browserless
+    is working, so it does not count against the breaker.
+    """
+    now = time.time()
+    if _breaker["failures"] >= BREAKER_THRESHOLD and now < _breaker["retry_at"]:
+        raise RuntimeError(
+            f"Water usage fetches paused after {_breaker['failures']} failures, "
+            f"until {datetime.fromtimestamp(_breaker['retry_at']).isoformat(timespec='seconds')}"
+        )
+
+    today = date.today()
+    day, used = _budget.get(context[SEW_USERNAME], (today, 0))
+    if day != today:
+        used = 0
+    if used >= DAILY_LOGIN_BUDGET:
+        raise RuntimeError(f"All {DAILY_LOGIN_BUDGET} logins for today have been used")
+    _budget[context[SEW_USERNAME]] = (today, used + 1)
+
+    headers = {"Content-Type": "application/json"}
+    data = get_scraper_payload(context)
+    if token == "" or token is None:
+        url = f"{browserless}/function"
+    else:
+        url = f"{browserless}/function?token={token}"
+
+    try:
+        usage_response = task.executor(  # noqa: F821
+            requests.request,
+            method="POST",
+            url=url,
+            headers=headers,
+            data=data,
+        )
+        usage_response.raise_for_status()
+        usage_response_data = json.loads(usage_response.text)
+    except Exception as ex:
+        _breaker["failures"] += 1
+        if _breaker["failures"] >= BREAKER_THRESHOLD:
+            _breaker["trips"] += 1
+            delay = min(
+                BREAKER_MAX_DELAY, BREAKER_BASE_DELAY * 2 ** (_breaker["trips"] - 1)
+            )
+            _breaker["retry_at"] = now + delay * random.uniform(0.8, 1.2)
+            retry_at = datetime.fromtimestamp(_breaker["retry_at"]).isoformat(
+                timespec="seconds"
+            )
+            log.warning(  # noqa: F821
+                f"Scraper failed {_breaker['failures']} times in a row, pausing until {retry_at}: {ex}"
+            )
+            persistent_notification.create(  # noqa: F821
+                title="South East Water usage fetches paused",
+                message=f"The scraper failed {_breaker['failures']} times in a row, so fetches are paused until {retry_at}. The last error was: {ex}",
+                notification_id=BREAKER_NOTIFICATION,
+            )
+        raise
+
+    if _breaker["failures"] >= BREAKER_THRESHOLD:
+        persistent_notification.dismiss(notification_id=BREAKER_NOTIFICATION)  # noqa: F821
+    _breaker["failures"] = 0
+    _breaker["trips"] = 0
+    if usage_response_data.get("login") is False:
+        raise RuntimeError("South East Water did not accept the username or password")
+    return usage_response_data
+
+
 @service  # noqa: F821
 def import_yesterdays_water_usage(
     mains_water_stat_id,
@@ -40,7 +183,7 @@ def import_yesterdays_water_usage(
         token: The browserless token to use. Example: 6R0W53R135510, or BLANK if running on the HASS addon
 
     """
-    yesterday = date.today() - timedelta(days = 1)
+    yesterday = date.today() - timedelta(days=1)
 
     import_water_usage(
         mains_water_stat_id=mains_water_stat_id,
@@ -48,7 +191,9 @@ def import_yesterdays_water_usage(
         sew_password=sew_password,
         target_date=yesterday,
         browserless=browserless,
-        token=token)
+        token=token,
+    )
+
 
 @service  # noqa: F821
 def import_water_usage(
@@ -81,63 +226,101 @@ def import_water_usage(
 
     """
 
-    # Open the puppeteer JS file - have to use OS open functions to bypass HASS blocking IO restriction
-    js_exec_path = f"{hass.config.config_dir}/pyscript/get_target_date_water_usage.js"  # noqa: F821
-    fd = os.open(js_exec_path, os.O_RDONLY)
-    js_exec_str = os.read(fd, Path(js_exec_path).stat().st_size)
-    js_executable = js_exec_str.decode()
-    os.close(fd)
-
     if not target_date or target_date == "":
         target_date = datetime.now() - timedelta(days=1)
     initial_date: datetime = datetime.strptime(target_date, "%Y-%m-%d")
     current_date: datetime = datetime.strptime(target_date, "%Y-%m-%d")
     current_date_str: str = current_date.strftime("%Y-%m-%d")
-    retrieved_date: datetime = current_date - timedelta(days = 1)
+    retrieved_date: datetime = current_date - timedelta(days=1)
 
     while retrieved_date < current_date:
-
         context = {
             SEW_USERNAME: sew_username,
             SEW_PASSWORD: sew_password,
             TARGET_DATE: current_date_str,
             GET_RECYCLED: False,
             SEW_BAID: default_sew_baId,
-            SEW_METERID: default_sew_meterId
+            SEW_METERID: default_sew_meterId,
         }
 
-        headers = {"Content-Type": "application/json"}
-        data = json.dumps({CODE: js_executable, CONTEXT: context})
-        if token == "" or token is None:
-            url = f"{browserless}/function"
-        else:
-            url = f"{browserless}/function?token={token}"
-
-        usage_response = task.executor(  # noqa: F821
-            requests.request,
-            method="POST",
-            url=url,
-            headers=headers,
-            data=data,
+        usage_response_data = call_scraper(browserless, token, context)
+        log.info(f"SEW fetch timings (ms): {usage_response_data.get('timings')}")  # noqa: F821
+        retrieved_date: datetime = datetime.strptime(
+            usage_response_data["mains"]["apiDate"].replace("T00:00:00+00:00", ""),
+            "%Y-%m-%d",
         )
 
-        usage_response_data = json.loads(usage_response.text)
-        retrieved_date: datetime = datetime.strptime(usage_response_data["mains"]["apiDate"].replace("T00:00:00+00:00", ""), "%Y-%m-%d")
-
         if retrieved_date >= initial_date:
             # Import the data to statistics
             import_water_usage_data(mains_water_stat_id, "mains", usage_response_data)
         else:
             # bump forward a day to account for SEW retrieving a day prior to request, and loop
-            current_date = current_date + timedelta(days = 1)
+            current_date = current_date + timedelta(days=1)
             current_date_str: str = current_date.strftime("%Y-%m-%d")
-        
+
         if not target_date or target_date == "":
             break
-        
+
         if retrieved_date >= initial_date:
             break
 
+
+@service  # noqa: F821
+def import_water_usage_range(
+    mains_water_stat_id,
+    sew_username,
+    sew_password,
+    date_from: datetime,
+    date_to: datetime,
+    browserless: str,
+    token: str = "",
+    default_sew_baId: str = "",
+    default_sew_meterId: str = "",
+):
+    """Get Water Usage for a Range of Dates.
+
+    description: Imports Water Usage from South East Water's
+    Website.  Logs In once, Navigates to Water Usage Summary,
+    Downloads Data for every date from date_from to date_to,
+    Imports into Sensor(s) in one pass.
+
+    Arguments:
+        mains_water_stat_id: The sensor to return the mains water usage to. Example: sensor.water_usage_mains
+        sew_username: Your Username for the South East Water (SEW) website. Example: myusername@gmail.com
+        sew_password: Your Password for the South East Water (SEW) website. Example: myC0mpl3xP@55w0rd
+        date_from: The first date you want to import data for. Example: 2024-11-20
+        date_to: The last date you want to import data for. Example: 2024-11-27
+        browserless: The URL that the browserless instance is running on. Example: http://localhost:3000
+
+    Keyword Arguments:
+        token: The browserless token to use. Example: 6R0W53R135510, or blank if running on the HASS addon
+        default_sew_baId: The default SEW internal Account ID (baId) to pass in. Retrieve from Local Storage using developer tools. Example: b02341111112b5EITGY
+        default_sew_meterId: The default SEW internal Meter ID (meterId) to pass in. Retrieve from Local Storage using developer tools. Example: c2E82222222ZG1FEBT
+
+    """
+
+    if not date_to or date_to == "":
+        date_to = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    if not date_from or date_from == "":
+        date_from = date_to
+
+    context = {
+        SEW_USERNAME: sew_username,
+        SEW_PASSWORD: sew_password,
+        DATE_FROM: str(date_from)[:10],
+        DATE_TO: str(date_to)[:10],
+        GET_RECYCLED: False,
+        SEW_BAID: default_sew_baId,
+        SEW_METERID: default_sew_meterId,
+    }
+
+    usage_response_data = call_scraper(browserless, token, context)
+    log.info(f"SEW fetch timings (ms): {usage_response_data.get('timings')}")  # noqa: F821
+
+    # Import every retrieved day to statistics in one pass
+    import_water_usage_days(mains_water_stat_id, "mains", usage_response_data["mains"])
+
+
 @service  # noqa: F821
 def import_file_water_usage(stat_id, file_path_under_config):
     """Get Water Usage by loading file.  Concatenates Config Dir / File Path.
@@ -161,6 +344,41 @@ def import_file_water_usage(stat_id, file_path_under_config):
     # Import the data to statistics
     import_water_usage_data(stat_id, "mains", usage_response_data)
 
+
+def import_water_usage_days(stat_id, type, days):
+    """Import Water Usage Data for several days, carrying the tally between days.
+
+    fields:
+        stat_id:
+            example: sensor.water_usage_mains
+            required: true
+        type:
+            example: mains
+            required: true
+        days:
+            example: list of json day data returned from South East Water
+            required: true
+    """
+    starting_point = float(state.get(stat_id))  # noqa: F821
+    tally = starting_point
+    stats = []
+    start = None
+
+    for day in days:
+        day_stats, tally = build_water_usage_statistics(type, {type: day}, tally)
+        stats.extend(day_stats)
+
+    if stats:
+        start = stats[-1]["start"]
+    write_water_usage_statistics(stat_id, stats)
+
+    log.info(f"Imported {len(days)} days of statistics")  # noqa: F821
+    if tally > starting_point:
+        state.set("input_datetime.last_water_date", start)
+
+    return tally
+
+
 def import_water_usage_data(stat_id, type, data):
     """Import Water Usage Data.
 
@@ -175,39 +393,103 @@ def import_water_usage_data(stat_id, type, data):
             example: json data returned from South East Water
             required: true
     """
-    starting_point = float(state.get(stat_id))  # noqa: F821
+    return import_water_usage_days(stat_id, type, [data[type]])
+
+
+def build_water_usage_statistics(type, data, starting_point):
+    """Build the hourly statistic rows for one day of Water Usage Data.
+
+    fields:
+        type:
+            example: mains
+            required: true
+        data:
+            example: json data returned from South East Water
+            required: true
+        starting_point:
+            example: tally the first reading of the day is added to
+            required: true
 
+    Returns the statistic rows and the tally after the last reading.
+    """
     readings = data[type]["readings"]
+    hour_starts = get_hour_starts(date.fromisoformat(data[type]["apiDate"][:10]))
 
     tally = starting_point
+    stats = []
 
-    for idx, reading in enumerate(readings):
+    for idx, reading in enumerate(readings[:24]):
         litres = reading
 
         if litres is None:
             continue  # skip value if no usage
 
-        data_date = data[type]["apiDate"].replace("+00:00", "").replace("T", " ")
-        datetime_object = datetime.strptime(data_date, "%Y-%m-%d %H:%M:%S") + timedelta(hours=idx)
-
-        start = str(datetime_object.astimezone())
+        start = hour_starts[idx]
         tally += litres
 
-        statistic_element = {"start": start, "state": tally, "sum": tally, "max": tally}
+        if stats and stats[-1]["start"] == start:
+            # the hour clocks skip when daylight saving starts shares the next hour's row
+            stats[-1].update({"state": tally, "sum": tally, "max": tally})
+        else:
+            stats.append({"start": start, "state": tally, "sum": tally, "max": tally})
 
-        # Import recorder statistics
-        recorder.import_statistics(  # noqa: F821
-            statistic_id=stat_id,
-            source="recorder",
-            unit_of_measurement="L",
-            has_sum=True,
-            has_mean=False,
-            stats=[statistic_element],
-        )
+    return stats, tally
+
+
+def get_hour_starts(day_date):
+    """Return the local start of each of the 24 wall clock hours of a day.
+
+    fields:
+        day_date:
+            example: 2024-10-06
+            required: true
+
+    Days without a daylight saving change reuse the UTC offset of midnight for every hour.
+    When the clocks go forward the skipped hour starts with the hour after it, and when
+    they go back the repeated hour starts at its first occurrence.
+    """
+    midnight = datetime.combine(day_date, datetime.min.time()).astimezone()
+    next_midnight = datetime.combine(
+        day_date + timedelta(days=1), datetime.min.time()
+    ).astimezone()
+
+    if midnight.utcoffset() == next_midnight.utcoffset():
+        return [str(midnight + timedelta(hours=hour)) for hour in range(24)]
+
+    hour_starts = []
+    for hour in range(24):
+        start = datetime.combine(day_date, datetime.min.time().replace(hour=hour))
+        hour_starts.append(str(start.astimezone()))
+    return hour_starts
+
+
+def write_water_usage_statistics(stat_id, stats):
+    """Import all statistic rows for a statistic id in a single recorder call.
+
+    fields:
+        stat_id:
+            example: sensor.water_usage_mains
+            required: true
+        stats:
+            example: statistic rows built by build_water_usage_statistics
+            required: true
+    """
+    if not stats:
+        return
+
+    # Import recorder statistics
+    recorder.import_statistics(  # noqa: F821
+        statistic_id=stat_id,
+        source="recorder",
+        unit_of_measurement="L",
+        has_sum=True,
+        has_mean=False,
+        stats=stats,
+    )
+
+    # the recorder writes the rows later, so only the count is known here
+    log.info(f"Queued {len(stats)} statistic rows for import to {stat_id}")  # noqa: F821
 
-    log.info("Imported statistics")  # noqa: F821
-    if tally > starting_point:
-        state.set("input_datetime.last_water_date", start)
 
 @service  # noqa: F821
 def force_water_state(stat_id, tally):